@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class AirportConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "airport"
+
+    def ready(self):
+        import airport.signals  # noqa: F401
+        from airport.replica import check_pin_cache
+        from airport.throttling import check_store
+
+        check_pin_cache()
+        check_store()
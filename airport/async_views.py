@@ -0,0 +1,178 @@
+import functools
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.http import HttpResponse
+from rest_framework import status
+from rest_framework.exceptions import (
+    APIException,
+    NotAuthenticated,
+    NotFound,
+    Throttled,
+    ValidationError,
+)
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.views import exception_handler
+
+from airport.models import Flight
+from airport.pagination import after, decode_cursor, encode_cursor
+from airport.replica import choose_replica, reads_from
+from airport.serializers import (
+    FlightDetailSerializer,
+    FlightListSerializer,
+    RouteListSerializer,
+    SeatMapSerializer,
+)
+from airport.views import FlightViewSet, RouteViewSet
+from user.authentication import ClaimsJWTAuthentication
+
+
+def json_response(data, status_code=status.HTTP_200_OK, headers=None):
+    return HttpResponse(
+        JSONRenderer().render(data),
+        status=status_code,
+        headers=headers,
+        content_type="application/json",
+    )
+
+
+def authenticate(request):
+    """
+    The claims user of the request's JWT access token, ``None`` for
+    requests without one, found without touching the database.
+    """
+    result = ClaimsJWTAuthentication().authenticate(request)
+    return result and result[0]
+
+
+def check_throttles(request) -> None:
+    waits = [
+        throttle.wait()
+        for throttle in (
+            throttle_class()
+            for throttle_class in api_settings.DEFAULT_THROTTLE_CLASSES
+        )
+        if not throttle.allow_request(request, None)
+    ]
+    if waits:
+        raise Throttled(max((wait for wait in waits if wait), default=None))
+
+
+def async_read_only(view):
+    """
+    Run ``view(request, ...)`` for authenticated GET requests under the
+    same throttles as the DRF views and render its data or API error as
+    JSON, the way the sync viewsets would.
+    """
+
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD"):
+            return json_response(
+                {"detail": f'Method "{request.method}" not allowed.'},
+                status.HTTP_405_METHOD_NOT_ALLOWED,
+                headers={"Allow": "GET, HEAD"},
+            )
+        request = Request(request)
+        try:
+            user = authenticate(request)
+            if user is None:
+                raise NotAuthenticated()
+            request.user = user
+            await sync_to_async(check_throttles)(request)
+            replica = await sync_to_async(choose_replica)(request)
+            with reads_from(replica):
+                data = await view(request, *args, **kwargs)
+        except APIException as exc:
+            response = exception_handler(exc, {"request": request})
+            headers = {
+                name: value
+                for name, value in response.items()
+                if name in ("WWW-Authenticate", "Retry-After")
+            }
+            return json_response(response.data, response.status_code, headers)
+        return json_response(data)
+
+    return wrapper
+
+
+async def keyset_page(request, view, serializer_class) -> dict:
+    """
+    Page of ``view``'s filtered queryset in ``view.keyset_ordering``,
+    ``?limit=`` rows after the opaque ``?cursor=``, with the total
+    ``count`` only on ``?count=true``.
+    """
+    params = request.query_params
+    ordering = view.keyset_ordering
+    try:
+        limit = min(int(params.get("limit", api_settings.PAGE_SIZE)), 100)
+    except ValueError:
+        raise ValidationError({"limit": "A valid integer is required."})
+    if limit < 1:
+        raise ValidationError({"limit": "Ensure this value is at least 1."})
+
+    queryset = view.get_queryset()
+    data = {}
+    if params.get("count") == "true":
+        data["count"] = await queryset.acount()
+    page = queryset.order_by(*ordering)
+    if "cursor" in params:
+        position = decode_cursor(params["cursor"], len(ordering))
+        # only forward cursors are handed out here
+        if position is None or position[1]:
+            raise ValidationError({"cursor": "Invalid cursor."})
+        try:
+            page = page.filter(after(ordering, position[0]))
+        except (ValueError, TypeError, DjangoValidationError):
+            raise ValidationError({"cursor": "Invalid cursor."})
+    objects = [obj async for obj in page[: limit + 1]]
+
+    data["next"] = None
+    if len(objects) > limit:
+        objects = objects[:limit]
+        last = objects[-1]
+        query = params.copy()
+        query["cursor"] = encode_cursor(
+            [getattr(last, field.lstrip("-")) for field in ordering]
+        )
+        data["next"] = request.build_absolute_uri(
+            f"{request.path}?{query.urlencode()}"
+        )
+    data["results"] = serializer_class(objects, many=True).data
+    return data
+
+
+def get_view(viewset_class, request, action, **kwargs):
+    """Viewset instance reused for its query parameter filters."""
+    return viewset_class(
+        request=request, action=action, kwargs=kwargs, format_kwarg=None
+    )
+
+
+@async_read_only
+async def flight_list(request):
+    """Flights with the filters of ``/flight/``, oldest departure first."""
+    view = get_view(FlightViewSet, request, "list")
+    return await keyset_page(request, view, FlightListSerializer)
+
+
+@async_read_only
+async def flight_detail(request, pk):
+    """Flight details together with its packed seat map."""
+    view = get_view(FlightViewSet, request, "retrieve", pk=pk)
+    try:
+        flight = await view.get_queryset().aget(pk=pk)
+    except Flight.DoesNotExist:
+        raise NotFound()
+    data = FlightDetailSerializer(flight).data
+    data["seat_map"] = SeatMapSerializer(flight.seat_map).data
+    return data
+
+
+@async_read_only
+async def route_list(request):
+    """Routes with the filters of ``/route/``."""
+    view = get_view(RouteViewSet, request, "list")
+    return await keyset_page(request, view, RouteListSerializer)
@@ -0,0 +1,185 @@
+from itertools import islice
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import IntegrityError, transaction
+from rest_framework import serializers, status
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.validators import UniqueTogetherValidator, UniqueValidator
+
+from airport.cache import invalidate
+
+BATCH_SIZE = 1000
+MAX_OBJECTS = 10_000
+
+
+class BatchPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    ``PrimaryKeyRelatedField`` that resolves the keys of a whole payload
+    with one ``in_bulk`` per batch in :meth:`prefetch`, instead of one
+    query per row.
+    """
+
+    instances = None
+
+    def to_pk(self, data):
+        if self.pk_field is not None:
+            data = self.pk_field.to_internal_value(data)
+        if isinstance(data, bool):
+            raise TypeError(data)
+        try:
+            return self.get_queryset().model._meta.pk.to_python(data)
+        except DjangoValidationError:
+            raise ValueError(data)
+
+    def prefetch(self, values):
+        pks = set()
+        for value in values:
+            try:
+                pks.add(self.to_pk(value))
+            except (TypeError, ValueError, serializers.ValidationError):
+                # reported by to_internal_value()
+                pass
+        pks = list(pks)
+        self.instances = {}
+        for start in range(0, len(pks), BATCH_SIZE):
+            self.instances.update(
+                self.get_queryset().in_bulk(pks[start : start + BATCH_SIZE])
+            )
+
+    def to_internal_value(self, data):
+        if self.instances is None:
+            return super().to_internal_value(data)
+        try:
+            pk = self.to_pk(data)
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        try:
+            return self.instances[pk]
+        except (KeyError, TypeError):
+            self.fail("does_not_exist", pk_value=data)
+
+
+class BulkUpsertListSerializer(serializers.ListSerializer):
+    """
+    Insert or update many objects in one ``bulk_create`` per batch, keyed on
+    the child's ``Meta.upsert_fields`` (one of the model's unique
+    constraints). Rows whose key exists are updated instead of rejected by
+    the unique validators; a key repeated in the payload keeps its last row.
+    The payload is stored in one transaction.
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("max_length", MAX_OBJECTS)
+        kwargs.setdefault("allow_empty", False)
+        super().__init__(*args, **kwargs)
+        # before the child builds its fields
+        self.child.serializer_related_field = BatchPrimaryKeyRelatedField
+        self.child.validators = [
+            validator
+            for validator in self.child.validators
+            if not isinstance(validator, UniqueTogetherValidator)
+        ]
+        for field in self.child.fields.values():
+            field.validators = [
+                validator
+                for validator in field.validators
+                if not isinstance(validator, UniqueValidator)
+            ]
+        self.related_fields = [
+            field
+            for field in self.child._writable_fields
+            if isinstance(field, BatchPrimaryKeyRelatedField)
+        ]
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            rows = [row for row in data if isinstance(row, dict)]
+            for field in self.related_fields:
+                field.prefetch(
+                    row[field.field_name]
+                    for row in rows
+                    if row.get(field.field_name) is not None
+                )
+        return super().to_internal_value(data)
+
+    def create(self, validated_data):
+        try:
+            with transaction.atomic():
+                objects = self.upsert(validated_data)
+        except IntegrityError as error:
+            raise serializers.ValidationError(
+                {api_settings.NON_FIELD_ERRORS_KEY: [str(error)]}
+            )
+        # bulk_create() sends no post_save signals
+        invalidate(self.child.Meta.model)
+        return objects
+
+    def upsert(self, validated_data):
+        model = self.child.Meta.model
+        unique_fields = list(self.child.Meta.upsert_fields)
+        key_attnames = [
+            model._meta.get_field(name).attname for name in unique_fields
+        ]
+        update_fields = [
+            field.source
+            for field in self.child._writable_fields
+            if field.source not in unique_fields
+        ]
+        if update_fields and any(
+            field.name == "updated_at" for field in model._meta.fields
+        ):
+            update_fields.append("updated_at")
+
+        def key(obj):
+            return tuple(getattr(obj, attname) for attname in key_attnames)
+
+        objects = list(
+            {
+                key(obj): obj
+                for obj in (model(**attrs) for attrs in validated_data)
+            }.values()
+        )
+        prepare = getattr(self.child, "prepare_bulk", None)
+        if prepare:
+            prepare(objects)
+
+        stored = {}
+        iterator = iter(objects)
+        while batch := list(islice(iterator, BATCH_SIZE)):
+            model.objects.bulk_create(
+                batch,
+                update_conflicts=True,
+                unique_fields=unique_fields,
+                # a no-op update keeps the conflict handling uniform
+                # when the key is the only writable data
+                update_fields=update_fields or unique_fields,
+            )
+            # bulk_create() sets no primary keys of upserted rows here
+            for obj in model.objects.filter(
+                **{
+                    f"{attname}__in": {getattr(obj, attname) for obj in batch}
+                    for attname in key_attnames
+                }
+            ):
+                stored[key(obj)] = obj
+        return [stored[key(obj)] for obj in objects]
+
+
+class BulkUpsertMixin:
+    """
+    ``create`` that also accepts a JSON array of objects and upserts them
+    with :class:`BulkUpsertListSerializer`.
+    """
+
+    def create(self, request, *args, **kwargs):
+        if not isinstance(request.data, list):
+            return super().create(request, *args, **kwargs)
+        serializer = BulkUpsertListSerializer(
+            child=self.get_serializer_class()(),
+            data=request.data,
+            context=self.get_serializer_context(),
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -0,0 +1,125 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework.response import Response
+
+from airport.replica import current_replica
+
+STATS = ("hits", "misses", "invalidations")
+
+
+def get_cache():
+    return caches[settings.CATALOG_CACHE_ALIAS]
+
+
+def _version_key(model) -> str:
+    return f"catalog:version:{model._meta.label_lower}"
+
+
+def _changed_key(model) -> str:
+    return f"catalog:changed:{model._meta.label_lower}"
+
+
+def _count(name: str) -> None:
+    cache = get_cache()
+    key = f"catalog:stats:{name}"
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # evicted between add() and incr()
+        cache.set(key, 1, timeout=None)
+
+
+def _versions(models) -> list:
+    """
+    Current version of every model. A missing (never set or evicted)
+    version starts from the clock, so entries cached under a version
+    that was lost are never served again.
+    """
+    cache = get_cache()
+    keys = [_version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def _bump(model) -> None:
+    cache = get_cache()
+    key = _version_key(model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+    cache.set(_changed_key(model), time.time(), timeout=None)
+
+
+def _changed_since(models, seconds: float) -> bool:
+    changes = get_cache().get_many([_changed_key(model) for model in models])
+    return any(changed > time.time() - seconds for changed in changes.values())
+
+
+def invalidate(model) -> None:
+    """
+    Drop every cached response built from ``model``. The version is
+    bumped again on commit, so a response cached from the old rows while
+    the write was still uncommitted is dropped as well.
+    """
+    _bump(model)
+    _count("invalidations")
+    transaction.on_commit(lambda: _bump(model))
+
+
+def get_stats() -> dict:
+    values = get_cache().get_many([f"catalog:stats:{name}" for name in STATS])
+    stats = {name: values.get(f"catalog:stats:{name}", 0) for name in STATS}
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+    return stats
+
+
+class CachedResponseMixin:
+    """
+    Serve ``list`` and ``retrieve`` of a read-mostly viewset from the
+    catalog cache, keyed on the full URL and on the versions of
+    ``cache_models``, the models its serializers read. Authentication,
+    permissions and throttling still run on every request.
+    """
+
+    cache_models = ()
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    def get_cache_key(self, request) -> str:
+        versions = ":".join(map(str, _versions(self.cache_models)))
+        url = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+        return f"catalog:response:{self.basename}:{versions}:{url}"
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        cache = get_cache()
+        key = self.get_cache_key(request)
+        data = cache.get(key)
+        if data is not None:
+            _count("hits")
+            return Response(data)
+        _count("misses")
+        response = handler(request, *args, **kwargs)
+        # a replica may not have the change that bumped the version yet
+        if response.status_code == 200 and not (
+            current_replica()
+            and _changed_since(
+                self.cache_models, settings.REPLICA_STICKINESS.total_seconds()
+            )
+        ):
+            cache.set(key, response.data)
+        return response
@@ -0,0 +1,135 @@
+import hashlib
+
+from django.http import Http404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.generics import get_object_or_404
+
+VALIDATOR_HEADERS = ("HTTP_IF_NONE_MATCH", "HTTP_IF_MODIFIED_SINCE")
+
+
+class ConditionalGetMixin:
+    """
+    ETag and Last-Modified validators for ``list``, ``retrieve`` and
+    detail GET actions, computed from the ``id`` and ``updated_at`` of the
+    served rows (and the page links of a list), which the signals keep
+    moving whenever a representation changes. A request carrying
+    validators first loads only those columns of the page or object, and
+    if they still match gets an empty 304 without running the view.
+    Last-Modified is only sent for single objects, as rows leaving a list
+    would not move it.
+    """
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def get_object(self):
+        obj = super().get_object()
+        self.validated_object = obj
+        return obj
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        self.validated_page = page
+        return page
+
+    def get_validator_queryset(self):
+        """The filtered queryset of the view loading only the validators."""
+        fields = {"updated_at"} | {
+            field.lstrip("-") for field in getattr(self, "keyset_ordering", ())
+        }
+        return (
+            self.filter_queryset(self.get_queryset())
+            .select_related(None)
+            .prefetch_related(None)
+            .only(*fields)
+        )
+
+    def get_validators(self, request, objects, paginator=None, detail=False):
+        version = [request.accepted_media_type, request.path]
+        version += [
+            f"{obj.pk}@{obj.updated_at.isoformat()}" for obj in objects
+        ]
+        if paginator is not None:
+            version += [
+                str(paginator.get_next_link()),
+                str(paginator.get_previous_link()),
+                str(getattr(paginator, "count", None)),
+            ]
+        etag = hashlib.md5("|".join(version).encode()).hexdigest()
+        return {
+            "etag": quote_etag(etag),
+            "last_modified": (
+                int(objects[0].updated_at.timestamp()) if detail else None
+            ),
+        }
+
+    def load_validators(self, request, detail):
+        """Validators from a query of the ids and timestamps alone."""
+        queryset = self.get_validator_queryset()
+        if detail:
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            try:
+                obj = get_object_or_404(
+                    queryset,
+                    **{self.lookup_field: self.kwargs[lookup_url_kwarg]},
+                )
+            except Http404:
+                # left to the view
+                return None
+            self.check_object_permissions(request, obj)
+            return self.get_validators(request, [obj], detail=True)
+        if self.pagination_class is None:
+            return self.get_validators(request, queryset)
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        return self.get_validators(request, page, paginator)
+
+    def loaded_validators(self, request, detail):
+        """Validators of the rows the view loaded, if it loaded them."""
+        if detail and self.validated_object is not None:
+            return self.get_validators(
+                request, [self.validated_object], detail=True
+            )
+        if not detail and self.validated_page is not None:
+            return self.get_validators(
+                request, self.validated_page, self.paginator
+            )
+        # served from the catalog cache
+        return None
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        detail = (self.lookup_url_kwarg or self.lookup_field) in kwargs
+        self.validated_object = self.validated_page = None
+        if any(header in request.META for header in VALIDATOR_HEADERS):
+            validators = self.load_validators(request, detail)
+            if validators is not None:
+                not_modified = get_conditional_response(request, **validators)
+                if not_modified is not None:
+                    return self.set_validators(not_modified, validators)
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code != 200:
+            return response
+        validators = self.loaded_validators(
+            request, detail
+        ) or self.load_validators(request, detail)
+        if validators is None:
+            return response
+        return self.set_validators(response, validators)
+
+    @staticmethod
+    def set_validators(response, validators):
+        response.headers["ETag"] = validators["etag"]
+        if validators["last_modified"] is not None:
+            response.headers["Last-Modified"] = http_date(
+                validators["last_modified"]
+            )
+        return response
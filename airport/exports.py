@@ -0,0 +1,140 @@
+import csv
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count
+from django.http import StreamingHttpResponse
+
+from airport.models import Order, Ticket
+
+CHUNK_SIZE = 2000
+
+TICKET_COLUMNS = (
+    ("id", "id"),
+    ("row", "row"),
+    ("seat", "seat"),
+    ("flight", "flight_id"),
+    ("route", "flight__route__route_description"),
+    ("departure_time", "flight__departure_time"),
+    ("order", "order_id"),
+    ("ordered_at", "order__created"),
+    ("email", "order__user__email"),
+)
+
+ORDER_COLUMNS = (
+    ("id", "id"),
+    ("created", "created"),
+    ("user", "user_id"),
+    ("email", "user__email"),
+    ("tickets", "tickets_count"),
+)
+
+MANIFEST_COLUMNS = (
+    ("row", "row"),
+    ("seat", "seat"),
+    ("first_name", "order__user__first_name"),
+    ("last_name", "order__user__last_name"),
+    ("email", "order__user__email"),
+    ("order", "order_id"),
+    ("ticket", "id"),
+)
+
+
+def tickets():
+    return Ticket.objects.order_by("id"), TICKET_COLUMNS
+
+
+def orders():
+    return (
+        Order.objects.annotate(tickets_count=Count("tickets")).order_by("id"),
+        ORDER_COLUMNS,
+    )
+
+
+def flight_manifest(flight_id: int):
+    return (
+        Ticket.objects.filter(flight_id=flight_id).order_by("row", "seat"),
+        MANIFEST_COLUMNS,
+    )
+
+
+class Echo:
+    """File-like object for csv.writer that returns each line."""
+
+    def write(self, value):
+        return value
+
+
+def csv_writer(header):
+    """(first line, row formatter) of a CSV file."""
+    writer = csv.writer(Echo())
+    return writer.writerow(header), writer.writerow
+
+
+def ndjson_writer(header):
+    """(first line, row formatter) of newline-delimited JSON."""
+    encoder = DjangoJSONEncoder()
+    return "", lambda row: encoder.encode(dict(zip(header, row))) + "\n"
+
+
+FORMATS = {
+    "csv": ("text/csv", csv_writer),
+    "ndjson": ("application/x-ndjson", ndjson_writer),
+}
+
+
+def lines(writer, header, rows):
+    first, line = writer(header)
+    if first:
+        yield first
+    for row in rows:
+        yield line(row)
+
+
+async def in_chunks(rows):
+    """
+    Rows of the sync iterator ``rows``, read ``CHUNK_SIZE`` at a time in
+    the thread that owns the database connection. QuerySet.aiterator()
+    runs the query of values_list() in the event loop on Django 4.2.
+    """
+
+    def next_chunk():
+        return list(islice(rows, CHUNK_SIZE))
+
+    while chunk := await sync_to_async(next_chunk)():
+        for row in chunk:
+            yield row
+
+
+async def alines(writer, header, rows):
+    first, line = writer(header)
+    if first:
+        yield first
+    async for row in rows:
+        yield line(row)
+
+
+def stream_export(request, queryset, columns, file_format: str, filename: str):
+    """
+    Response writing ``columns`` (pairs of header and lookup) of every row
+    while a server-side cursor reads them ``CHUNK_SIZE`` at a time, so
+    memory stays flat whatever the number of rows. Under ASGI the rows are
+    read by an async iterator, as Django would load a sync one into a list
+    before sending it.
+    """
+    content_type, writer = FORMATS[file_format]
+    header = [name for name, lookup in columns]
+    rows = queryset.values_list(
+        *(lookup for name, lookup in columns)
+    ).iterator(chunk_size=CHUNK_SIZE)
+    if isinstance(getattr(request, "_request", request), ASGIRequest):
+        content = alines(writer, header, in_chunks(rows))
+    else:
+        content = lines(writer, header, rows)
+    response = StreamingHttpResponse(content, content_type=content_type)
+    response["Content-Disposition"] = (
+        f'attachment; filename="{filename}.{file_format}"'
+    )
+    return response
@@ -0,0 +1,45 @@
+from django.db import DatabaseError, connections
+
+POOL_STATS = (
+    "pool_min",
+    "pool_max",
+    "pool_size",
+    "pool_available",
+    "requests_waiting",
+    "requests_num",
+    "requests_queued",
+    "requests_wait_ms",
+    "requests_errors",
+    "connections_num",
+    "connections_ms",
+    "connections_errors",
+    "connections_lost",
+)
+
+
+def check_database(alias: str = "default") -> bool:
+    try:
+        with connections[alias].cursor() as cursor:
+            cursor.execute("SELECT 1")
+    except DatabaseError:
+        return False
+    return True
+
+
+def get_pool_stats(alias: str = "default"):
+    """
+    Counters of this process' connection pool of ``alias`` since it was
+    opened, ``None`` when the database is not pooled.
+    """
+    pool = getattr(connections[alias], "pool", None)
+    if pool is None:
+        return None
+    # psycopg_pool leaves out counters that are still zero
+    stats = pool.get_stats()
+    data = {name: stats.get(name, 0) for name in POOL_STATS}
+    data["avg_wait_ms"] = (
+        round(data["requests_wait_ms"] / data["requests_num"], 2)
+        if data["requests_num"]
+        else 0.0
+    )
+    return data
@@ -0,0 +1,196 @@
+import json
+import statistics
+import time
+import tracemalloc
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework.views import APIView
+
+from airport.cache import CachedResponseMixin
+from airport.urls import router
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure SQL queries, p50/p95 latency and peak memory of every GET "
+        "route of the airport API against the current database and "
+        "optionally compare them with a saved JSON baseline"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--email",
+            help="User to authenticate as (default: first superuser)",
+        )
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument(
+            "--host",
+            default="localhost",
+            help="Host header, must be in ALLOWED_HOSTS",
+        )
+        parser.add_argument("--save", help="Write results to this JSON file")
+        parser.add_argument(
+            "--baseline", help="Fail on regressions against this JSON file"
+        )
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=20.0,
+            help="Allowed p95 latency increase over the baseline, percent",
+        )
+
+    def handle(self, *args, **options):
+        if options["iterations"] < 2:
+            raise CommandError("--iterations must be at least 2")
+        user = self.get_user(options["email"])
+        client = APIClient(HTTP_HOST=options["host"])
+        client.force_authenticate(user)
+
+        results = {}
+        # the runs would otherwise use up (and fail on) the user's rate
+        # limit, which is counted across processes and runs
+        with mock.patch.object(APIView, "get_throttles", return_value=[]):
+            for name, url, cached in self.get_endpoints(user):
+                # every response is built from the database, so catalog
+                # endpoints report their real query count
+                with self.uncached_catalog():
+                    results[name] = self.measure(
+                        client, url, options["iterations"]
+                    )
+                self.report(name, results[name])
+                if cached:
+                    name = f"{name}:cached"
+                    results[name] = self.measure(
+                        client, url, options["iterations"]
+                    )
+                    self.report(name, results[name])
+
+        if options["save"]:
+            with open(options["save"], "w") as file:
+                json.dump(results, file, indent=2, sort_keys=True)
+        if options["baseline"]:
+            with open(options["baseline"]) as file:
+                baseline = json.load(file)
+            regressions = self.compare(results, baseline, options["tolerance"])
+            if regressions:
+                raise CommandError(
+                    "Performance regressions:\n" + "\n".join(regressions)
+                )
+            self.stdout.write(self.style.SUCCESS("No regressions"))
+
+    def report(self, name, result):
+        self.stdout.write(
+            f"{name}: {result['queries']} queries, "
+            f"p50 {result['p50_ms']} ms, "
+            f"p95 {result['p95_ms']} ms, "
+            f"peak {result['peak_memory_kb']} KiB"
+        )
+
+    @staticmethod
+    def uncached_catalog():
+        return override_settings(
+            CACHES={
+                **settings.CACHES,
+                "benchmark": {
+                    "BACKEND": "django.core.cache.backends.dummy.DummyCache"
+                },
+            },
+            CATALOG_CACHE_ALIAS="benchmark",
+        )
+
+    @staticmethod
+    def get_user(email):
+        users = get_user_model().objects.all()
+        user = (
+            users.filter(email=email).first()
+            if email
+            else users.filter(is_superuser=True).order_by("pk").first()
+        )
+        if user is None:
+            raise CommandError("User to authenticate as does not exist")
+        return user
+
+    @staticmethod
+    def get_endpoints(user):
+        """
+        Yield (name, url, cached) of list, retrieve and detail GET actions,
+        ``cached`` for list and retrieve of catalog cached viewsets.
+        """
+        for prefix, viewset, basename in router.registry:
+            cached = issubclass(viewset, CachedResponseMixin)
+            yield (
+                f"{basename}-list",
+                reverse(f"airport:{basename}-list"),
+                cached,
+            )
+            model = viewset.queryset.model
+            objects = model.objects.order_by("pk")
+            if hasattr(model, "user"):
+                objects = objects.filter(user=user)
+            pk = objects.values_list("pk", flat=True).first()
+            if pk is None:
+                continue
+            yield (
+                f"{basename}-detail",
+                reverse(f"airport:{basename}-detail", kwargs={"pk": pk}),
+                cached,
+            )
+            for extra_action in viewset.get_extra_actions():
+                if extra_action.detail and "get" in extra_action.mapping:
+                    name = f"{basename}-{extra_action.url_name}"
+                    yield (
+                        name,
+                        reverse(f"airport:{name}", kwargs={"pk": pk}),
+                        False,
+                    )
+
+    @staticmethod
+    def measure(client, url, iterations):
+        client.get(url)
+        timings = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            response = client.get(url)
+            timings.append((time.perf_counter() - start) * 1000)
+            if response.status_code != 200:
+                raise CommandError(f"GET {url} -> {response.status_code}")
+
+        tracemalloc.start()
+        with CaptureQueriesContext(connection) as queries:
+            client.get(url)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        return {
+            "url": url,
+            "queries": len(queries),
+            "p50_ms": round(statistics.median(timings), 2),
+            "p95_ms": round(statistics.quantiles(timings, n=20)[18], 2),
+            "peak_memory_kb": round(peak / 1024, 1),
+        }
+
+    @staticmethod
+    def compare(results, baseline, tolerance):
+        regressions = []
+        for name, result in results.items():
+            if name not in baseline:
+                continue
+            expected = baseline[name]
+            if result["queries"] > expected["queries"]:
+                regressions.append(
+                    f"{name}: {result['queries']} queries, "
+                    f"baseline {expected['queries']}"
+                )
+            if result["p95_ms"] > expected["p95_ms"] * (1 + tolerance / 100):
+                regressions.append(
+                    f"{name}: p95 {result['p95_ms']} ms, "
+                    f"baseline {expected['p95_ms']} ms"
+                )
+        return regressions
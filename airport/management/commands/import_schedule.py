@@ -0,0 +1,46 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from airport.schedule_import import import_schedule, read_rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Create flights with their crew from a CSV or JSON schedule file. "
+        "Rows with errors are reported and skipped, the rest are imported"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument(
+            "--format",
+            choices=("csv", "json"),
+            help="Schedule format (default: from the file extension)",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        file_format = options["format"] or (
+            "json" if path.lower().endswith(".json") else "csv"
+        )
+        try:
+            with open(path, newline="", encoding="utf-8-sig") as file:
+                result = import_schedule(
+                    read_rows(file, file_format),
+                    batch_size=options["batch_size"],
+                )
+        except (OSError, ValueError) as error:
+            raise CommandError(error)
+
+        for error in result["errors"]:
+            self.stderr.write(
+                f"row {error['row']}: {json.dumps(error['errors'])}"
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {result['created']} flights, "
+                f"rejected {len(result['errors'])} rows"
+            )
+        )
@@ -0,0 +1,138 @@
+import http.client
+import json
+import statistics
+import threading
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+DEFAULT_PATHS = (
+    "/api/airport/flight/",
+    "/api/airport/route/",
+    "/api/airport/airport/",
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Send GET requests to a running server from concurrent keep-alive "
+        "connections for a fixed time and report throughput and latency"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("base_url", help="e.g. http://localhost:8000")
+        parser.add_argument("--email", required=True)
+        parser.add_argument("--password", required=True)
+        parser.add_argument(
+            "--path",
+            action="append",
+            dest="paths",
+            help="Path to request, repeat for several (default: flight, "
+            "route and airport lists)",
+        )
+        parser.add_argument("--concurrency", type=int, default=16)
+        parser.add_argument(
+            "--duration",
+            type=float,
+            default=30.0,
+            help="Seconds, within the access token lifetime",
+        )
+        parser.add_argument("--save", help="Write results to this JSON file")
+
+    def handle(self, *args, **options):
+        if options["concurrency"] < 1 or options["duration"] <= 0:
+            raise CommandError("--concurrency and --duration must be > 0")
+        url = urlsplit(options["base_url"])
+        if url.scheme not in ("http", "https") or not url.netloc:
+            raise CommandError("base_url must be an http(s) URL")
+        token = self.get_token(url, options["email"], options["password"])
+        paths = options["paths"] or DEFAULT_PATHS
+
+        timings, statuses = [], Counter()
+        lock = threading.Lock()
+        deadline = time.monotonic() + options["duration"]
+
+        def worker(offset):
+            connection = self.connect(url)
+            headers = {"Authorization": f"Bearer {token}"}
+            index = offset
+            while time.monotonic() < deadline:
+                path = paths[index % len(paths)]
+                index += 1
+                start = time.perf_counter()
+                try:
+                    connection.request("GET", path, headers=headers)
+                    response = connection.getresponse()
+                    response.read()
+                    status = response.status
+                except (OSError, http.client.HTTPException):
+                    connection.close()
+                    connection = self.connect(url)
+                    status = "error"
+                elapsed = (time.perf_counter() - start) * 1000
+                with lock:
+                    timings.append(elapsed)
+                    statuses[status] += 1
+            connection.close()
+
+        started = time.monotonic()
+        threads = [
+            threading.Thread(target=worker, args=(offset,))
+            for offset in range(options["concurrency"])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - started
+
+        if len(timings) < 2:
+            raise CommandError("Too few responses to report on")
+        percentiles = statistics.quantiles(timings, n=100)
+        results = {
+            "requests": len(timings),
+            "requests_per_second": round(len(timings) / elapsed, 1),
+            "p50_ms": round(percentiles[49], 2),
+            "p95_ms": round(percentiles[94], 2),
+            "p99_ms": round(percentiles[98], 2),
+            "statuses": {str(key): value for key, value in statuses.items()},
+        }
+        self.stdout.write(
+            f"{results['requests']} requests, "
+            f"{results['requests_per_second']} req/s, "
+            f"p50 {results['p50_ms']} ms, p95 {results['p95_ms']} ms, "
+            f"p99 {results['p99_ms']} ms, statuses {results['statuses']}"
+        )
+        if options["save"]:
+            with open(options["save"], "w") as file:
+                json.dump(results, file, indent=2, sort_keys=True)
+
+    @staticmethod
+    def connect(url):
+        connection_class = (
+            http.client.HTTPSConnection
+            if url.scheme == "https"
+            else http.client.HTTPConnection
+        )
+        return connection_class(url.netloc, timeout=30)
+
+    def get_token(self, url, email, password):
+        connection = self.connect(url)
+        try:
+            connection.request(
+                "POST",
+                "/api/user/token/",
+                body=json.dumps({"email": email, "password": password}),
+                headers={"Content-Type": "application/json"},
+            )
+            response = connection.getresponse()
+            data = response.read()
+        except (OSError, http.client.HTTPException) as error:
+            raise CommandError(f"Server is not reachable: {error}")
+        finally:
+            connection.close()
+        if response.status != 200:
+            raise CommandError(f"Could not get a token: {response.status}")
+        return json.loads(data)["access"]
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from airport.models import Flight
+from airport.seat_counters import drifted_flights, reconcile_seat_counters
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute Flight.seats_taken and Flight.seats_total from tickets "
+        "and airplanes and fix flights whose counters drifted"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report how many flights drifted",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if options["dry_run"]:
+            drifted = drifted_flights(Flight.objects.all()).count()
+            self.stdout.write(f"Flights with drifted counters: {drifted}")
+            return
+        fixed = reconcile_seat_counters(
+            Flight.objects.all(), batch_size=options["batch_size"]
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"Fixed seat counters of {fixed} flights")
+        )
@@ -0,0 +1,240 @@
+import random
+from datetime import timedelta
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from airport.models import (
+    AirplaneType,
+    Airplane,
+    Country,
+    City,
+    Airport,
+    Route,
+    Crew,
+    Flight,
+    Order,
+    Ticket,
+)
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill the database with a reproducible synthetic dataset for load "
+        "testing. Names are prefixed with --prefix, so use a new prefix to "
+        "add another dataset next to an existing one"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--prefix", default="load")
+        parser.add_argument("--countries", type=int, default=50)
+        parser.add_argument("--cities-per-country", type=int, default=10)
+        parser.add_argument("--airports-per-city", type=int, default=2)
+        parser.add_argument("--routes", type=int, default=5_000)
+        parser.add_argument("--airplane-types", type=int, default=10)
+        parser.add_argument("--airplanes", type=int, default=500)
+        parser.add_argument("--crew", type=int, default=2_000)
+        parser.add_argument("--flights", type=int, default=20_000)
+        parser.add_argument("--users", type=int, default=1_000)
+        parser.add_argument("--tickets", type=int, default=1_000_000)
+        parser.add_argument("--batch-size", type=int, default=5_000)
+        parser.add_argument(
+            "--password",
+            default="load-password",
+            help="Password of every generated user",
+        )
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+        prefix = options["prefix"]
+        if options["airports_per_city"] < 1:
+            raise CommandError("--airports-per-city must be at least 1")
+
+        countries = self.bulk_create(
+            Country(name=f"{prefix} country {i}")
+            for i in range(options["countries"])
+        )
+        cities = self.bulk_create(
+            City(name=f"{prefix} city {country.id}-{i}", country=country)
+            for country in countries
+            for i in range(options["cities_per_country"])
+        )
+        airports = self.bulk_create(
+            Airport(
+                name=f"{prefix} airport {city.id}-{i}", closest_big_city=city
+            )
+            for city in cities
+            for i in range(options["airports_per_city"])
+        )
+        if len(airports) < 2:
+            raise CommandError("At least two airports are needed for routes")
+        if options["routes"] > len(airports) * (len(airports) - 1):
+            raise CommandError("--routes exceeds the number of airport pairs")
+        routes = self.bulk_create(
+            self.generate_routes(airports, options["routes"])
+        )
+        airplane_types = self.bulk_create(
+            AirplaneType(name=f"{prefix} type {i}")
+            for i in range(options["airplane_types"])
+        )
+        airplanes = self.bulk_create(
+            Airplane(
+                name=f"{prefix} airplane {i}",
+                rows=self.rng.randint(10, 60),
+                seats_in_row=self.rng.choice((4, 6, 8, 10)),
+                airplane_type=self.rng.choice(airplane_types),
+            )
+            for i in range(options["airplanes"])
+        )
+        crew = self.bulk_create(
+            Crew(
+                first_name=f"{prefix} first name {i}",
+                last_name=f"{prefix} last name {i}",
+                position=self.rng.choice(
+                    ("captain", "first officer", "flight attendant")
+                ),
+            )
+            for i in range(options["crew"])
+        )
+        flights = self.bulk_create(
+            self.generate_flight(routes, airplanes)
+            for _ in range(options["flights"])
+        )
+        self.bulk_create(
+            Flight.crew.through(flight_id=flight.id, crew_id=member.id)
+            for flight in flights
+            for member in self.rng.sample(
+                crew, min(len(crew), self.rng.randint(2, 4))
+            )
+        )
+        password = make_password(options["password"])
+        users = self.bulk_create(
+            get_user_model()(
+                email=f"{prefix}-user-{i}@example.com", password=password
+            )
+            for i in range(options["users"])
+        )
+        tickets = self.create_tickets(flights, users, options["tickets"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {len(countries)} countries, {len(cities)} cities, "
+                f"{len(airports)} airports, {len(routes)} routes, "
+                f"{len(airplanes)} airplanes, {len(crew)} crew, "
+                f"{len(flights)} flights, {len(users)} users "
+                f"and {tickets} tickets"
+            )
+        )
+
+    def bulk_create(self, objects):
+        created = []
+        for chunk in chunked(objects, self.batch_size):
+            created.extend(type(chunk[0]).objects.bulk_create(chunk))
+        return created
+
+    def generate_routes(self, airports, count):
+        """Routes between ``count`` distinct airport pairs."""
+        pairs = set()
+        while len(pairs) < count:
+            source, destination = self.rng.sample(airports, 2)
+            if (source.id, destination.id) in pairs:
+                continue
+            pairs.add((source.id, destination.id))
+            # bulk_create skips Route.save(), so the description is built
+            # here from the already loaded airports, cities and countries
+            yield Route(
+                source=source,
+                destination=destination,
+                distance=self.rng.randint(200, 12_000),
+                route_description=Route.build_description(source, destination),
+            )
+
+    def generate_flight(self, routes, airplanes):
+        route = self.rng.choice(routes)
+        airplane = self.rng.choice(airplanes)
+        departure_time = timezone.now() + timedelta(
+            minutes=self.rng.randint(60, 365 * 24 * 60)
+        )
+        return Flight(
+            route=route,
+            airplane=airplane,
+            departure_time=departure_time,
+            arrival_time=departure_time
+            + timedelta(minutes=30 + route.distance * 60 // 800),
+            seats_total=airplane.rows * airplane.seats_in_row,
+        )
+
+    def create_tickets(self, flights, users, total):
+        """
+        Spread ``total`` tickets over the flights in orders of 1-4 seats,
+        a chunk of flights at a time to keep memory flat.
+        """
+        if not flights or not users:
+            return 0
+        per_flight, extra = divmod(total, len(flights))
+        created = 0
+        for chunk in chunked(enumerate(flights), self.batch_size // 10 or 1):
+            orders, seats = [], []
+            for index, flight in chunk:
+                wanted = per_flight + (index < extra)
+                taken = self.rng.sample(
+                    range(flight.seats_total), min(wanted, flight.seats_total)
+                )
+                flight.seats_taken = len(taken)
+                while taken:
+                    size = self.rng.randint(1, 4)
+                    orders.append(Order(user=self.rng.choice(users)))
+                    seats.append((flight, taken[:size]))
+                    taken = taken[size:]
+            orders = self.bulk_create(orders)
+            rows = (
+                (
+                    seat // flight.airplane.seats_in_row + 1,
+                    seat % flight.airplane.seats_in_row + 1,
+                    flight.id,
+                    order.id,
+                )
+                for order, (flight, order_seats) in zip(orders, seats)
+                for seat in order_seats
+            )
+            created += self.insert_tickets(rows)
+            Flight.objects.bulk_update(
+                [flight for index, flight in chunk], ["seats_taken"]
+            )
+        return created
+
+    def insert_tickets(self, rows):
+        """Insert (row, seat, flight_id, order_id) tuples, via COPY on
+        PostgreSQL and bulk_create elsewhere."""
+        if connection.vendor != "postgresql":
+            tickets = self.bulk_create(
+                Ticket(row=row, seat=seat, flight_id=flight_id, order_id=order)
+                for row, seat, flight_id, order in rows
+            )
+            return len(tickets)
+
+        quote = connection.ops.quote_name
+        columns = ", ".join(
+            quote(column)
+            for column in ("row", "seat", "flight_id", "order_id")
+        )
+        count = 0
+        with connection.cursor() as cursor:
+            with cursor.cursor.copy(
+                f"COPY {quote(Ticket._meta.db_table)} ({columns}) FROM STDIN"
+            ) as copy:
+                for row in rows:
+                    copy.write_row(row)
+                    count += 1
+        return count
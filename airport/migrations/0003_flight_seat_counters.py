@@ -0,0 +1,31 @@
+# Generated by Django 4.2.9 on 2026-10-18 04:57
+
+from django.db import migrations, models
+
+from airport.seat_counters import reconcile_seat_counters
+
+
+def fill_seat_counters(apps, schema_editor):
+    Flight = apps.get_model("airport", "Flight")
+    reconcile_seat_counters(Flight.objects.all())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airport", "0002_seathold"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="flight",
+            name="seats_taken",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="flight",
+            name="seats_total",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_seat_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+from django.db import migrations
+
+# Django compiles ``name__icontains`` on PostgreSQL to
+# ``UPPER("name"::text) LIKE UPPER(%s)``, so trigram GIN indexes over the
+# same expression serve the existing country/city/airport filters of the
+# airport, route and flight endpoints without changing their queries.
+# Other databases keep the plain LIKE scan.
+TRIGRAM_INDEXES = (
+    ("airport_country_name_trgm", "airport_country"),
+    ("airport_city_name_trgm", "airport_city"),
+    ("airport_airport_name_trgm", "airport_airport"),
+)
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for index, table in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {index} ON {table} "
+            f"USING gin ((UPPER(name::text)) gin_trgm_ops)"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for index, table in TRIGRAM_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {index}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airport", "0003_flight_seat_counters"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
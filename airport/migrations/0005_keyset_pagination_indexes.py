@@ -0,0 +1,27 @@
+# Generated by Django 4.2.9 on 2026-10-18 05:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airport", "0004_name_trigram_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="flight",
+            index=models.Index(
+                fields=["departure_time", "id"],
+                name="airport_fli_departu_5be25a_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["user", "created", "id"],
+                name="airport_ord_user_id_3dc202_idx",
+            ),
+        ),
+    ]
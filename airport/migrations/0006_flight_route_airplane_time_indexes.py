@@ -0,0 +1,48 @@
+# Generated by Django 4.2.9 on 2026-10-18 05:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airport", "0005_keyset_pagination_indexes"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="flight",
+            name="airplane",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="flights",
+                to="airport.airplane",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="flight",
+            name="route",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="flights",
+                to="airport.route",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="flight",
+            index=models.Index(
+                fields=["route", "departure_time"],
+                name="airport_fli_route_i_baa295_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="flight",
+            index=models.Index(
+                fields=["airplane", "departure_time"],
+                name="airport_fli_airplan_da655c_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 4.2.9 on 2026-10-18 05:30
+
+from django.db import migrations
+from django.db.models import Count
+
+
+def duplicates(model, *fields):
+    """Rows sharing ``fields`` with an older row, grouped by the oldest."""
+    keys = (
+        model.objects.values(*fields)
+        .annotate(count=Count("pk"))
+        .filter(count__gt=1)
+        .values_list(*fields)
+    )
+    for key in keys:
+        keep, *extra = model.objects.filter(**dict(zip(fields, key))).order_by(
+            "pk"
+        )
+        yield keep, extra
+
+
+def merge_airport(Route, airport, into):
+    Route.objects.filter(source=airport).update(source=into)
+    Route.objects.filter(destination=airport).update(destination=into)
+    airport.delete()
+
+
+def dedupe_cities_and_routes(apps, schema_editor):
+    City = apps.get_model("airport", "City")
+    Airport = apps.get_model("airport", "Airport")
+    Route = apps.get_model("airport", "Route")
+    Flight = apps.get_model("airport", "Flight")
+
+    for city, extra in duplicates(City, "name", "country"):
+        for airport in Airport.objects.filter(closest_big_city__in=extra):
+            twin = Airport.objects.filter(
+                name=airport.name, closest_big_city=city
+            ).first()
+            if twin is None:
+                Airport.objects.filter(pk=airport.pk).update(
+                    closest_big_city=city
+                )
+            else:
+                merge_airport(Route, airport, twin)
+        City.objects.filter(
+            pk__in=[duplicate.pk for duplicate in extra]
+        ).delete()
+
+    for route, extra in duplicates(Route, "source", "destination"):
+        Flight.objects.filter(route__in=extra).update(route=route)
+        Route.objects.filter(
+            pk__in=[duplicate.pk for duplicate in extra]
+        ).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airport", "0007_updated_at"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            dedupe_cities_and_routes, migrations.RunPython.noop
+        ),
+        migrations.AlterUniqueTogether(
+            name="city",
+            unique_together={("name", "country")},
+        ),
+        migrations.AlterUniqueTogether(
+            name="route",
+            unique_together={("source", "destination")},
+        ),
+    ]
@@ -1,6 +1,10 @@
 from django.db import models
-from django.db.models import ForeignKey
+from django.db.models import ForeignKey, F, OuterRef, Subquery, Value
+from django.db.models.functions import Concat, Left
+from django.utils import timezone
+from django.utils.functional import cached_property
 
+from airport.seat_map import SeatMap
 from service_config import settings
 
 
@@ -36,6 +40,9 @@ class City(models.Model):
         Country, on_delete=models.CASCADE, related_name="cities"
     )
 
+    class Meta:
+        unique_together = ("name", "country")
+
     def __str__(self):
         return self.name
 
@@ -45,6 +52,7 @@ class Airport(models.Model):
     closest_big_city = ForeignKey(
         City, on_delete=models.CASCADE, related_name="airports"
     )
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         unique_together = ("name", "closest_big_city")
@@ -62,23 +70,66 @@ class Route(models.Model):
     )
     distance = models.IntegerField()
     route_description = models.CharField(max_length=255, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("source", "destination")
 
     def __str__(self):
-        return f"From {self.source.name} to {self.destination.name}"
+        return self.route_description
+
+    @staticmethod
+    def build_description(source: Airport, destination: Airport) -> str:
+        """Label from airports with their city and country loaded."""
+        return (
+            f"From {source.name} ({source.closest_big_city.name} / "
+            f"{source.closest_big_city.country.name})"
+            f" to {destination.name} "
+            f"({destination.closest_big_city.name}"
+            f" / {destination.closest_big_city.country.name})"
+        )[: Route._meta.get_field("route_description").max_length]
+
+    @staticmethod
+    def description_expression():
+        """The same label as an SQL expression for set-based updates."""
+
+        def airport_label(field):
+            return Subquery(
+                Airport.objects.filter(pk=OuterRef(field))
+                .annotate(
+                    label=Concat(
+                        "name",
+                        Value(" ("),
+                        "closest_big_city__name",
+                        Value(" / "),
+                        "closest_big_city__country__name",
+                        Value(")"),
+                        output_field=models.CharField(),
+                    )
+                )
+                .values("label")
+            )
+
+        return Left(
+            Concat(
+                Value("From "),
+                airport_label("source_id"),
+                Value(" to "),
+                airport_label("destination_id"),
+                output_field=models.CharField(),
+            ),
+            Route._meta.get_field("route_description").max_length,
+        )
 
     def save(self, *args, **kwargs):
-        self.route_description = (
-            f"From {self.source.name} ({self.source.closest_big_city.name} / "
-            f"{self.source.closest_big_city.country.name})"
-            f" to {self.destination.name} "
-            f"({self.destination.closest_big_city.name}"
-            f" / {self.destination.closest_big_city.country.name})"
+        airports = Airport.objects.select_related(
+            "closest_big_city__country"
+        ).in_bulk([self.source_id, self.destination_id])
+        self.route_description = self.build_description(
+            airports[self.source_id], airports[self.destination_id]
         )
         super().save(*args, **kwargs)
 
-    # def __str__(self):
-    #     return self.route_description
-
 
 class Crew(models.Model):
     first_name = models.CharField(max_length=100)
@@ -91,14 +142,66 @@ class Crew(models.Model):
 
 class Flight(models.Model):
     route = models.ForeignKey(
-        Route, on_delete=models.CASCADE, related_name="flights"
+        Route,
+        on_delete=models.CASCADE,
+        related_name="flights",
+        db_index=False,
     )
     airplane = models.ForeignKey(
-        Airplane, on_delete=models.CASCADE, related_name="flights"
+        Airplane,
+        on_delete=models.CASCADE,
+        related_name="flights",
+        db_index=False,
     )
     departure_time = models.DateTimeField()
     arrival_time = models.DateTimeField()
     crew = models.ManyToManyField(Crew)
+    seats_total = models.PositiveIntegerField(default=0, editable=False)
+    seats_taken = models.PositiveIntegerField(default=0, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["departure_time", "id"]),
+            # also serve plain route/airplane lookups in place of the
+            # single-column foreign key indexes
+            models.Index(fields=["route", "departure_time"]),
+            models.Index(fields=["airplane", "departure_time"]),
+        ]
+
+    def save(
+        self,
+        force_insert=False,
+        force_update=False,
+        using=None,
+        update_fields=None,
+    ):
+        self.seats_total = self.airplane.rows * self.airplane.seats_in_row
+        if update_fields is None and not (force_insert or self._state.adding):
+            # seats_taken only moves with change_seats_taken(), writing
+            # back the loaded value would drop concurrent bookings
+            update_fields = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != "seats_taken"
+            ]
+        super().save(
+            force_insert=force_insert,
+            force_update=force_update,
+            using=using,
+            update_fields=update_fields,
+        )
+
+    @staticmethod
+    def change_seats_taken(flight_id: int, delta: int) -> None:
+        """Atomically shift the denormalized taken seats counter."""
+        Flight.objects.filter(pk=flight_id).update(
+            seats_taken=F("seats_taken") + delta, updated_at=timezone.now()
+        )
+
+    @cached_property
+    def seat_map(self) -> SeatMap:
+        return SeatMap.for_flight(self)
 
 
 class Order(models.Model):
@@ -109,6 +212,31 @@ class Order(models.Model):
         related_name="orders",
     )
 
+    class Meta:
+        indexes = [models.Index(fields=["user", "created", "id"])]
+
+
+class SeatHold(models.Model):
+    """Short-lived reservation of a seat made before the order is placed."""
+
+    row = models.IntegerField()
+    seat = models.IntegerField()
+    flight = models.ForeignKey(
+        Flight, on_delete=models.CASCADE, related_name="seat_holds"
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="seat_holds",
+    )
+    expires_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"row: {self.row} seat: {self.seat}"
+
+    class Meta:
+        unique_together = ("row", "seat", "flight")
+
 
 class Ticket(models.Model):
     row = models.IntegerField()
@@ -0,0 +1,169 @@
+import base64
+import json
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def encode_cursor(values, reverse: bool = False) -> str:
+    """Opaque cursor of a row's ordering ``values`` and the direction."""
+    position = {"values": list(values), "reverse": reverse}
+    return base64.urlsafe_b64encode(
+        json.dumps(position, cls=DjangoJSONEncoder).encode()
+    ).decode()
+
+
+def decode_cursor(cursor: str, size: int):
+    """(values, reverse) of ``cursor``, ``None`` if it is malformed."""
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        values, reverse = position["values"], position["reverse"]
+    except (ValueError, TypeError, KeyError):
+        return None
+    if not isinstance(values, list) or len(values) != size:
+        return None
+    return values, bool(reverse)
+
+
+def reverse_ordering(ordering) -> tuple:
+    return tuple(
+        field[1:] if field.startswith("-") else f"-{field}"
+        for field in ordering
+    )
+
+
+def after(ordering, values) -> Q:
+    """
+    Rows that come after ``values`` of the ``ordering`` fields. The
+    redundant bound on the leading field lets the database start the scan
+    of the ordering index at the cursor instead of at its first entry.
+    """
+    condition = Q()
+    for index, field in enumerate(ordering):
+        lookup = "lt" if field.startswith("-") else "gt"
+        condition |= Q(
+            **{
+                previous.lstrip("-"): value
+                for previous, value in zip(ordering[:index], values[:index])
+            },
+            **{f"{field.lstrip('-')}__{lookup}": values[index]},
+        )
+    if len(ordering) > 1:
+        field = ordering[0]
+        lookup = "lte" if field.startswith("-") else "gte"
+        condition &= Q(**{f"{field.lstrip('-')}__{lookup}": values[0]})
+    return condition
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination over the view's ``keyset_ordering``, which must end
+    with a unique field and be backed by an index, so page 10 000 costs the
+    same as the first page. The cursor holds every ordering value of the
+    row it starts after, so rows that share the leading values are never
+    skipped or repeated. Unlike limit/offset it skips COUNT(*) unless
+    ``?count=true`` is passed.
+    """
+
+    page_size_query_param = "limit"
+    max_page_size = 100
+    count_query_param = "count"
+    invalid_cursor_message = "Invalid cursor"
+
+    def get_ordering(self, request, queryset, view):
+        return view.keyset_ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.count = None
+        if request.query_params.get(self.count_query_param) == "true":
+            self.count = queryset.count()
+
+        position = None
+        reverse = False
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            decoded = decode_cursor(cursor, len(self.ordering))
+            if decoded is None:
+                raise NotFound(self.invalid_cursor_message)
+            position, reverse = decoded
+        ordering = (
+            reverse_ordering(self.ordering) if reverse else self.ordering
+        )
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            try:
+                queryset = queryset.filter(after(ordering, position))
+            except (ValueError, TypeError, DjangoValidationError):
+                raise NotFound(self.invalid_cursor_message)
+
+        results = list(queryset[: self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[: self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+        return self.page
+
+    def get_position(self, obj) -> list:
+        return [getattr(obj, field.lstrip("-")) for field in self.ordering]
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        cursor = encode_cursor(self.get_position(self.page[-1]))
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, cursor
+        )
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        cursor = encode_cursor(self.get_position(self.page[0]), reverse=True)
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, cursor
+        )
+
+    def get_paginated_response(self, data):
+        response = {}
+        if self.count is not None:
+            response["count"] = self.count
+        response["next"] = self.get_next_link()
+        response["previous"] = self.get_previous_link()
+        response["results"] = data
+        return Response(response)
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema["properties"] = {
+            "count": {
+                "type": "integer",
+                "example": 123,
+                "description": f"Only with ?{self.count_query_param}=true",
+            },
+            **response_schema["properties"],
+        }
+        return response_schema
+
+    def get_schema_operation_parameters(self, view):
+        return super().get_schema_operation_parameters(view) + [
+            {
+                "name": self.count_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Pass true to include the total count.",
+                "schema": {"type": "boolean"},
+            }
+        ]
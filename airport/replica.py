@@ -0,0 +1,130 @@
+import contextlib
+import contextvars
+import random
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.permissions import SAFE_METHODS
+
+_replica = contextvars.ContextVar("replica", default=None)
+
+
+def check_pin_cache() -> None:
+    """
+    Refuse replicas with pins in a local memory cache: a user's next request
+    may go to a worker that never saw the pin.
+    """
+    if settings.DATABASE_REPLICAS and isinstance(
+        caches[settings.REPLICA_PIN_CACHE_ALIAS], LocMemCache
+    ):
+        raise ImproperlyConfigured(
+            "Read replicas need a REPLICA_PIN_CACHE_ALIAS cache shared by "
+            f"all workers, the {settings.REPLICA_PIN_CACHE_ALIAS!r} cache is "
+            "local memory."
+        )
+
+
+def _pin_key(user) -> str:
+    return f"replica:pin:{user.pk}"
+
+
+def pin_to_primary(user) -> None:
+    """Keep the reads of ``user`` on the primary for the stickiness window."""
+    caches[settings.REPLICA_PIN_CACHE_ALIAS].set(
+        _pin_key(user), True, settings.REPLICA_STICKINESS.total_seconds()
+    )
+
+
+def is_pinned(user) -> bool:
+    return bool(
+        user
+        and user.is_authenticated
+        and caches[settings.REPLICA_PIN_CACHE_ALIAS].get(_pin_key(user))
+    )
+
+
+def choose_replica(request):
+    """
+    Replica alias to serve the reads of ``request`` from, ``None`` for
+    unsafe methods and for users who wrote within the stickiness window,
+    who may not see their own changes on a lagging replica.
+    """
+    if (
+        not settings.DATABASE_REPLICAS
+        or request.method not in SAFE_METHODS
+        or is_pinned(request.user)
+    ):
+        return None
+    return random.choice(settings.DATABASE_REPLICAS)
+
+
+def current_replica():
+    """Replica alias the reads of the current request go to, if any."""
+    return _replica.get()
+
+
+@contextlib.contextmanager
+def reads_from(alias):
+    """Route the reads of the block to the replica ``alias`` (or primary)."""
+    token = _replica.set(alias)
+    try:
+        yield
+    finally:
+        _replica.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Send reads to the replica chosen for the current request, if any, and
+    everything else to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        return _replica.get() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        # also for objects that were read from a replica
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.DATABASE_REPLICAS
+
+
+class ReplicaReadMixin:
+    """
+    Serve the safe-method requests of a view from a read replica, once the
+    request is authenticated and its user is known not to be pinned.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        with reads_from(None):
+            return super().dispatch(request, *args, **kwargs)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        _replica.set(choose_replica(request))
+
+
+class ReplicaPinMiddleware:
+    """
+    Pin the user of every unsafe request to the primary, so their next
+    reads see what they wrote even on a lagging replica. DRF copies the
+    user it authenticated to the Django request.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if request.method not in SAFE_METHODS:
+            user = getattr(request, "user", None)
+            if user is not None and user.is_authenticated:
+                pin_to_primary(user)
+        return response
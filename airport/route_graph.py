@@ -0,0 +1,139 @@
+import heapq
+import threading
+from bisect import bisect_left, insort
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import NamedTuple
+
+from django.conf import settings
+from django.utils import timezone
+
+
+class Leg(NamedTuple):
+    departure_time: datetime
+    arrival_time: datetime
+    destination_id: int
+    flight_id: int
+
+
+class RouteGraph:
+    """
+    Time-expanded flight graph kept in process memory: for every airport
+    the departing flights sorted by departure time. Built lazily, patched
+    by model signals and fully rebuilt once it is older than ``ttl`` so
+    changes made by other processes are picked up too.
+    """
+
+    def __init__(self, ttl: timedelta):
+        self.ttl = ttl
+        self.built_at = None
+        self._lock = threading.RLock()
+        self._departures = defaultdict(list)
+        self._legs = {}
+
+    def build(self) -> None:
+        from airport.models import Flight
+
+        since = timezone.now() - timedelta(days=1)
+        flights = Flight.objects.filter(departure_time__gte=since).values_list(
+            "id",
+            "route__source_id",
+            "route__destination_id",
+            "departure_time",
+            "arrival_time",
+        )
+        departures = defaultdict(list)
+        legs = {}
+        for flight_id, source, destination, departure, arrival in flights:
+            leg = Leg(departure, arrival, destination, flight_id)
+            departures[source].append(leg)
+            legs[flight_id] = (source, leg)
+        for airport_legs in departures.values():
+            airport_legs.sort()
+        with self._lock:
+            self._departures = departures
+            self._legs = legs
+            self.built_at = timezone.now()
+
+    def ensure_built(self) -> None:
+        if self.built_at is None or timezone.now() - self.built_at > self.ttl:
+            self.build()
+
+    def add_flight(
+        self, flight_id, source_id, destination_id, departure, arrival
+    ) -> None:
+        """Insert or move the flight's leg, no-op until the graph is built."""
+        with self._lock:
+            if self.built_at is None:
+                return
+            self.remove_flight(flight_id)
+            leg = Leg(departure, arrival, destination_id, flight_id)
+            insort(self._departures[source_id], leg)
+            self._legs[flight_id] = (source_id, leg)
+
+    def remove_flight(self, flight_id) -> None:
+        with self._lock:
+            source_id, leg = self._legs.pop(flight_id, (None, None))
+            if leg is not None:
+                self._departures[source_id].remove(leg)
+
+    def search(
+        self,
+        source_id: int,
+        destination_id: int,
+        departure_from: datetime,
+        departure_to: datetime,
+        min_connection: timedelta,
+        max_connections: int = 2,
+        max_layover: timedelta = timedelta(hours=24),
+        limit: int = 10,
+    ) -> list:
+        """
+        Itineraries (lists of Leg) ordered by arrival time: a label-setting
+        Dijkstra over (airport, legs flown) that keeps at most ``limit``
+        labels per state, so it yields the ``limit`` earliest arrivals.
+        """
+        self.ensure_built()
+        results = []
+        settled = defaultdict(int)
+        queue = []
+        counter = 0
+        with self._lock:
+            for leg in self._departures_between(
+                source_id, departure_from, departure_to
+            ):
+                heapq.heappush(queue, (leg.arrival_time, counter, (leg,)))
+                counter += 1
+            while queue and len(results) < limit:
+                arrival, _, path = heapq.heappop(queue)
+                airport = path[-1].destination_id
+                if airport == destination_id:
+                    results.append(list(path))
+                    continue
+                state = (airport, len(path))
+                if len(path) > max_connections or settled[state] >= limit:
+                    continue
+                settled[state] += 1
+                visited = {source_id} | {leg.destination_id for leg in path}
+                for leg in self._departures_between(
+                    airport,
+                    arrival + min_connection,
+                    arrival + max_layover,
+                ):
+                    if leg.destination_id in visited:
+                        continue
+                    heapq.heappush(
+                        queue, (leg.arrival_time, counter, path + (leg,))
+                    )
+                    counter += 1
+        return results
+
+    def _departures_between(self, airport_id, start, end):
+        legs = self._departures.get(airport_id, ())
+        index = bisect_left(legs, start, key=lambda leg: leg.departure_time)
+        while index < len(legs) and legs[index].departure_time < end:
+            yield legs[index]
+            index += 1
+
+
+route_graph = RouteGraph(ttl=settings.ROUTE_GRAPH_TTL)
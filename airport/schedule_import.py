@@ -0,0 +1,122 @@
+import csv
+import json
+from itertools import islice
+
+from django.db import transaction
+
+from airport.models import Airplane, Crew, Flight, Route
+from airport.route_graph import route_graph
+from airport.serializers import ScheduleRowSerializer
+
+
+def read_rows(file, file_format: str):
+    """
+    Flight records of a JSON array or of a CSV file with the header
+    ``route,airplane,departure_time,arrival_time,crew``, where crew ids
+    are separated by ``;``.
+    """
+    if file_format == "json":
+        rows = json.load(file)
+        if not isinstance(rows, list):
+            raise ValueError("A JSON schedule must be an array of flights")
+        return rows
+    return (
+        {
+            **row,
+            "crew": [pk for pk in (row.get("crew") or "").split(";") if pk],
+        }
+        for row in csv.DictReader(file)
+    )
+
+
+def import_schedule(rows, batch_size: int = 1000) -> dict:
+    """
+    Create the valid flights of ``rows`` with their crew, ``batch_size``
+    rows per transaction, and report the rejected ones by 1-based row
+    number instead of aborting.
+    """
+    created = 0
+    errors = []
+    numbered = enumerate(rows, start=1)
+    while batch := list(islice(numbered, batch_size)):
+        batch_created, batch_errors = import_batch(batch)
+        created += batch_created
+        errors.extend(batch_errors)
+    return {"created": created, "errors": errors}
+
+
+def import_batch(batch) -> tuple:
+    """Resolve references of (number, row) pairs with one lookup per
+    model and bulk create the flights and their crew rows."""
+    valid, errors = [], []
+    for number, row in batch:
+        serializer = ScheduleRowSerializer(data=row)
+        if serializer.is_valid():
+            valid.append((number, serializer.validated_data))
+        else:
+            errors.append({"row": number, "errors": serializer.errors})
+
+    routes = Route.objects.only("source_id", "destination_id").in_bulk(
+        {data["route"] for number, data in valid}
+    )
+    airplanes = Airplane.objects.only("rows", "seats_in_row").in_bulk(
+        {data["airplane"] for number, data in valid}
+    )
+    crew = set(
+        Crew.objects.filter(
+            pk__in={pk for number, data in valid for pk in data["crew"]}
+        ).values_list("pk", flat=True)
+    )
+
+    flights, flight_crews = [], []
+    for number, data in valid:
+        row_errors = {}
+        if data["route"] not in routes:
+            row_errors["route"] = [f"Route {data['route']} does not exist."]
+        if data["airplane"] not in airplanes:
+            row_errors["airplane"] = [
+                f"Airplane {data['airplane']} does not exist."
+            ]
+        missing_crew = sorted(set(data["crew"]) - crew)
+        if missing_crew:
+            row_errors["crew"] = [
+                f"Crew {pk} does not exist." for pk in missing_crew
+            ]
+        if row_errors:
+            errors.append({"row": number, "errors": row_errors})
+            continue
+        airplane = airplanes[data["airplane"]]
+        # bulk_create skips Flight.save(), so the counter is set here
+        flights.append(
+            Flight(
+                route_id=data["route"],
+                airplane_id=data["airplane"],
+                departure_time=data["departure_time"],
+                arrival_time=data["arrival_time"],
+                seats_total=airplane.rows * airplane.seats_in_row,
+            )
+        )
+        flight_crews.append(set(data["crew"]))
+
+    with transaction.atomic():
+        flights = Flight.objects.bulk_create(flights)
+        Flight.crew.through.objects.bulk_create(
+            Flight.crew.through(flight_id=flight.id, crew_id=pk)
+            for flight, members in zip(flights, flight_crews)
+            for pk in members
+        )
+        transaction.on_commit(lambda: add_to_route_graph(flights, routes))
+    errors.sort(key=lambda error: error["row"])
+    return len(flights), errors
+
+
+def add_to_route_graph(flights, routes) -> None:
+    for flight in flights:
+        route = routes[flight.route_id]
+        route_graph.add_flight(
+            flight.id,
+            route.source_id,
+            route.destination_id,
+            flight.departure_time,
+            flight.arrival_time,
+        )
@@ -0,0 +1,61 @@
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+
+def annotate_actual_seats(flights):
+    """Annotate flights with seat counters recomputed from tickets."""
+    ticket_model = flights.model._meta.get_field("taken_tickets").related_model
+    airplane_model = flights.model._meta.get_field("airplane").related_model
+    taken = (
+        ticket_model.objects.filter(flight=OuterRef("pk"))
+        .order_by()
+        .values("flight")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    total = (
+        airplane_model.objects.filter(pk=OuterRef("airplane_id"))
+        .annotate(total=F("rows") * F("seats_in_row"))
+        .values("total")
+    )
+    return flights.annotate(
+        actual_seats_taken=Coalesce(Subquery(taken), 0),
+        actual_seats_total=Subquery(total),
+    )
+
+
+def drifted_flights(flights):
+    """Flights whose counters differ from their tickets and airplane."""
+    return annotate_actual_seats(flights).exclude(
+        seats_taken=F("actual_seats_taken"),
+        seats_total=F("actual_seats_total"),
+    )
+
+
+def reconcile_seat_counters(flights, batch_size: int = 1000) -> int:
+    """Fix drifted counters, return the number of fixed flights."""
+    drifted = drifted_flights(flights)
+    fields = ["seats_taken", "seats_total"]
+    # bulk_update() skips auto_now, and the model state of the migration
+    # that first reconciles the counters has no updated_at yet
+    touch = any(
+        field.name == "updated_at" for field in flights.model._meta.fields
+    )
+    if touch:
+        fields.append("updated_at")
+    now = timezone.now()
+    fixed = 0
+    batch = []
+    for flight in drifted.only("id").iterator(chunk_size=batch_size):
+        flight.seats_taken = flight.actual_seats_taken
+        flight.seats_total = flight.actual_seats_total
+        if touch:
+            flight.updated_at = now
+        batch.append(flight)
+        if len(batch) == batch_size:
+            fixed += flights.model.objects.bulk_update(batch, fields)
+            batch = []
+    if batch:
+        fixed += flights.model.objects.bulk_update(batch, fields)
+    return fixed
@@ -0,0 +1,65 @@
+class SeatMap:
+    """
+    Occupancy of every seat on a flight packed into a bitset,
+    one bit per seat, rows laid out one after another.
+    """
+
+    def __init__(self, rows: int, seats_in_row: int):
+        self.rows = rows
+        self.seats_in_row = seats_in_row
+        self._bits = bytearray((rows * seats_in_row + 7) // 8)
+
+    @classmethod
+    def for_flight(cls, flight) -> "SeatMap":
+        """Build the map from the (possibly prefetched) taken tickets."""
+        seat_map = cls(flight.airplane.rows, flight.airplane.seats_in_row)
+        for ticket in flight.taken_tickets.all():
+            if seat_map.in_range(ticket.row, ticket.seat):
+                seat_map.take(ticket.row, ticket.seat)
+        return seat_map
+
+    def __len__(self):
+        return self.rows * self.seats_in_row
+
+    def in_range(self, row: int, seat: int) -> bool:
+        return 1 <= row <= self.rows and 1 <= seat <= self.seats_in_row
+
+    def _index(self, row: int, seat: int) -> int:
+        if not self.in_range(row, seat):
+            raise IndexError(f"row: {row} seat: {seat} is out of range")
+        return (row - 1) * self.seats_in_row + seat - 1
+
+    def take(self, row: int, seat: int) -> None:
+        index = self._index(row, seat)
+        self._bits[index >> 3] |= 1 << (index & 7)
+
+    def release(self, row: int, seat: int) -> None:
+        index = self._index(row, seat)
+        self._bits[index >> 3] &= ~(1 << (index & 7)) & 0xFF
+
+    def is_taken(self, row: int, seat: int) -> bool:
+        index = self._index(row, seat)
+        return bool(self._bits[index >> 3] & (1 << (index & 7)))
+
+    def seats(self, taken: bool):
+        """Yield (row, seat) pairs that are taken or free."""
+        index = 0
+        for row in range(1, self.rows + 1):
+            for seat in range(1, self.seats_in_row + 1):
+                if bool(self._bits[index >> 3] & (1 << (index & 7))) is taken:
+                    yield row, seat
+                index += 1
+
+    def available(self):
+        return self.seats(taken=False)
+
+    def taken(self):
+        return self.seats(taken=True)
+
+    def to_bytes(self) -> bytes:
+        """Packed occupancy, bit ``(row - 1) * seats_in_row + seat - 1``
+        (least significant bit first) is set for every taken seat."""
+        return bytes(self._bits)
+
+    def count_taken(self) -> int:
+        return sum(bin(byte).count("1") for byte in self._bits)
@@ -1,7 +1,15 @@
-from django.db import transaction
-from django.db.models import Count
+import base64
+from collections import Counter
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db import transaction, IntegrityError
+from django.db.models import Count, Q
+from django.utils import timezone
 from rest_framework import serializers
 from rest_framework.validators import UniqueTogetherValidator
+from drf_spectacular.utils import extend_schema_field
 
 from airport.models import (
     AirplaneType,
@@ -14,9 +22,21 @@ from airport.models import (
     Flight,
     Order,
     Ticket,
+    SeatHold,
 )
 
 
+def _seats_q(seats) -> Q:
+    """Match any of the (row, seat, flight_id) triples in one query."""
+    return reduce(
+        or_,
+        (
+            Q(row=row, seat=seat, flight_id=flight_id)
+            for row, seat, flight_id in seats
+        ),
+    )
+
+
 class AirplaneTypeSerializer(serializers.ModelSerializer):
     class Meta:
         model = AirplaneType
@@ -41,6 +61,7 @@ class CountrySerializer(serializers.ModelSerializer):
     class Meta:
         model = Country
         fields = ("id", "name")
+        upsert_fields = ("name",)
 
 
 class CountryListSerializer(serializers.ModelSerializer):
@@ -55,6 +76,7 @@ class CitySerializer(serializers.ModelSerializer):
     class Meta:
         model = City
         fields = ("id", "name", "country")
+        upsert_fields = ("name", "country")
 
 
 class CityListSerializer(serializers.ModelSerializer):
@@ -73,6 +95,7 @@ class AirportSerializer(serializers.ModelSerializer):
             "name",
             "closest_big_city",
         )
+        upsert_fields = ("name", "closest_big_city")
 
 
 class AirportListSerializer(serializers.ModelSerializer):
@@ -96,6 +119,21 @@ class RouteSerializer(serializers.ModelSerializer):
             "destination",
             "distance",
         )
+        upsert_fields = ("source", "destination")
+
+    @staticmethod
+    def prepare_bulk(routes):
+        """bulk_create skips Route.save(), so label the routes here."""
+        airports = Airport.objects.select_related(
+            "closest_big_city__country"
+        ).in_bulk(
+            {route.source_id for route in routes}
+            | {route.destination_id for route in routes}
+        )
+        for route in routes:
+            route.route_description = Route.build_description(
+                airports[route.source_id], airports[route.destination_id]
+            )
 
 
 class RouteListSerializer(serializers.ModelSerializer):
@@ -130,6 +168,32 @@ class FlightSerializer(serializers.ModelSerializer):
         )
 
 
+class ScheduleRowSerializer(serializers.Serializer):
+    """One flight of an imported schedule, references given by id."""
+
+    route = serializers.IntegerField(min_value=1)
+    airplane = serializers.IntegerField(min_value=1)
+    departure_time = serializers.DateTimeField()
+    arrival_time = serializers.DateTimeField()
+    crew = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        default=list,
+    )
+
+    def validate(self, attrs):
+        if attrs["arrival_time"] <= attrs["departure_time"]:
+            raise serializers.ValidationError(
+                {"arrival_time": "arrival_time must be after departure_time"}
+            )
+        return attrs
+
+
+class ScheduleImportResultSerializer(serializers.Serializer):
+    created = serializers.IntegerField()
+    errors = serializers.ListField(child=serializers.DictField())
+
+
 class FlightOrderSerializer(serializers.ModelSerializer):
     airplane = serializers.StringRelatedField(many=False, read_only=True)
     route = serializers.StringRelatedField(many=False, read_only=True)
@@ -145,6 +209,45 @@ class FlightOrderSerializer(serializers.ModelSerializer):
         )
 
 
+class FlightDateFilterSerializer(serializers.Serializer):
+    departure_after = serializers.DateTimeField(
+        required=False,
+        input_formats=["iso-8601", "%Y-%m-%d"],
+        help_text="Flights departing at or after this date/time",
+    )
+    departure_before = serializers.DateTimeField(
+        required=False,
+        input_formats=["iso-8601", "%Y-%m-%d"],
+        help_text="Flights departing before this date/time",
+    )
+    date = serializers.DateField(
+        required=False, help_text="Flights departing on this day"
+    )
+
+
+class ItinerarySearchSerializer(serializers.Serializer):
+    source = serializers.IntegerField(help_text="Id of departure airport")
+    destination = serializers.IntegerField(help_text="Id of arrival airport")
+    date = serializers.DateField(
+        required=False, help_text="Departure date, today by default"
+    )
+    max_connections = serializers.IntegerField(
+        min_value=0, max_value=2, default=2
+    )
+    min_connection_minutes = serializers.IntegerField(
+        min_value=0,
+        default=int(settings.ITINERARY_MIN_CONNECTION.total_seconds() // 60),
+    )
+    limit = serializers.IntegerField(min_value=1, max_value=50, default=10)
+
+
+class ItinerarySerializer(serializers.Serializer):
+    departure_time = serializers.DateTimeField()
+    arrival_time = serializers.DateTimeField()
+    connections = serializers.IntegerField()
+    flights = FlightOrderSerializer(many=True)
+
+
 class FlightListSerializer(serializers.ModelSerializer):
     airplane = serializers.StringRelatedField(many=False, read_only=True)
     route = serializers.StringRelatedField(many=False, read_only=True)
@@ -162,11 +265,10 @@ class FlightListSerializer(serializers.ModelSerializer):
         )
 
     def get_tickets(self, obj):
-        all_tickets = obj.airplane.rows * obj.airplane.seats_in_row
         return {
-            "all_tickets": all_tickets,
-            "taken_tickets": obj.num_taken_tickets,
-            "available_tickets": all_tickets - obj.num_taken_tickets,
+            "all_tickets": obj.seats_total,
+            "taken_tickets": obj.seats_taken,
+            "available_tickets": obj.seats_total - obj.seats_taken,
         }
 
 
@@ -191,15 +293,109 @@ class FlightDetailSerializer(serializers.ModelSerializer):
         )
 
     def get_available_tickets(self, obj):
-        available_tickets = []
-        taken_tickets = Ticket.objects.filter(flight=obj).values_list(
-            "row", "seat"
+        return [
+            f"row: {row} seat: {seat}"
+            for row, seat in obj.seat_map.available()
+        ]
+
+
+class SeatMapSerializer(serializers.Serializer):
+    rows = serializers.IntegerField(read_only=True)
+    seats_in_row = serializers.IntegerField(read_only=True)
+    taken_tickets = serializers.SerializerMethodField()
+    bitmap = serializers.SerializerMethodField(
+        help_text="Base64 of the packed occupancy bits, one bit per seat "
+        "in row-major order, least significant bit first, 1 = taken."
+    )
+
+    def get_taken_tickets(self, obj) -> int:
+        return obj.count_taken()
+
+    def get_bitmap(self, obj) -> str:
+        return base64.b64encode(obj.to_bytes()).decode("ascii")
+
+
+class SeatHoldSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SeatHold
+        fields = ("id", "row", "seat", "expires_at")
+        read_only_fields = ("id", "expires_at")
+        validators = []
+
+
+class FlightSeatHoldSerializer(serializers.Serializer):
+    """Hold seats of ``context["flight"]`` for the requesting user."""
+
+    seats = SeatHoldSerializer(many=True, allow_empty=False)
+
+    def validate_seats(self, seats):
+        flight = self.context["flight"]
+        user = self.context["request"].user
+        keys = set()
+        for seat in seats:
+            Ticket.validate_ticket(
+                row=seat["row"],
+                seat=seat["seat"],
+                rows=flight.airplane.rows,
+                seats=flight.airplane.seats_in_row,
+                error_to_rase=serializers.ValidationError,
+            )
+            key = (seat["row"], seat["seat"], flight.id)
+            if key in keys:
+                raise serializers.ValidationError(
+                    f"row: {key[0]} seat: {key[1]} is held twice."
+                )
+            keys.add(key)
+
+        taken = Ticket.objects.filter(_seats_q(keys)).first()
+        if taken is not None:
+            raise serializers.ValidationError(f"{taken} is already taken.")
+        held = (
+            SeatHold.objects.filter(
+                _seats_q(keys), expires_at__gt=timezone.now()
+            )
+            .exclude(user=user)
+            .first()
         )
-        for row in range(1, obj.airplane.rows + 1):
-            for seat in range(1, obj.airplane.seats_in_row + 1):
-                if (row, seat) not in taken_tickets:
-                    available_tickets.append(f"row: {row} seat: {seat}")
-        return available_tickets
+        if held is not None:
+            raise serializers.ValidationError(
+                f"{held} is held by another customer."
+            )
+        return seats
+
+    def create(self, validated_data):
+        flight = self.context["flight"]
+        user = self.context["request"].user
+        seats = validated_data["seats"]
+        now = timezone.now()
+        try:
+            with transaction.atomic():
+                SeatHold.objects.filter(flight=flight).filter(
+                    Q(expires_at__lte=now)
+                    | Q(
+                        _seats_q(
+                            (seat["row"], seat["seat"], flight.id)
+                            for seat in seats
+                        ),
+                        user=user,
+                    )
+                ).delete()
+                holds = SeatHold.objects.bulk_create(
+                    [
+                        SeatHold(
+                            flight=flight,
+                            user=user,
+                            expires_at=now + settings.SEAT_HOLD_TTL,
+                            **seat,
+                        )
+                        for seat in seats
+                    ]
+                )
+        except IntegrityError:
+            raise serializers.ValidationError(
+                {"seats": "Some of the seats have just been held or taken."}
+            )
+        return {"seats": holds}
 
 
 class TicketSerializer(serializers.ModelSerializer):
@@ -234,26 +430,197 @@ class TicketListSerializer(serializers.ModelSerializer):
 
 
 class OrderListSerializer(serializers.ModelSerializer):
-    tickets = TicketListSerializer(many=True, read_only=True)
+    tickets = serializers.SerializerMethodField()
 
     class Meta:
         model = Order
         fields = ("id", "created", "tickets")
 
+    @extend_schema_field(TicketListSerializer(many=True))
+    def get_tickets(self, obj):
+        tickets = getattr(obj, "flat_tickets", None)
+        if tickets is None:
+            tickets = obj.tickets.all()
+        return TicketListSerializer(tickets, many=True).data
+
+    @staticmethod
+    def load_tickets(orders) -> None:
+        """
+        Attach ``flat_tickets`` to the orders: their tickets and flights
+        read with one joined values() query, shaped like Ticket/Flight
+        instances for TicketListSerializer.
+        """
+        by_id = {}
+        for order in orders:
+            order.flat_tickets = []
+            by_id[order.id] = order
+        tickets = (
+            Ticket.objects.filter(order_id__in=by_id)
+            .order_by("order_id", "id")
+            .values_list(
+                "order_id",
+                "id",
+                "row",
+                "seat",
+                "flight_id",
+                "flight__route__route_description",
+                "flight__airplane__name",
+                "flight__departure_time",
+                "flight__arrival_time",
+            )
+        )
+        for (
+            order_id,
+            ticket_id,
+            row,
+            seat,
+            flight_id,
+            route,
+            airplane,
+            departure_time,
+            arrival_time,
+        ) in tickets:
+            by_id[order_id].flat_tickets.append(
+                {
+                    "id": ticket_id,
+                    "row": row,
+                    "seat": seat,
+                    "flight": {
+                        "id": flight_id,
+                        "route": route,
+                        "airplane": airplane,
+                        "departure_time": departure_time,
+                        "arrival_time": arrival_time,
+                    },
+                }
+            )
+
+
+class OrderTicketSerializer(serializers.ModelSerializer):
+    """Ticket of a new order, validated in bulk by OrderCreateSerializer."""
+
+    flight = serializers.IntegerField(source="flight_id")
+
+    class Meta:
+        model = Ticket
+        fields = ("id", "row", "seat", "flight")
+        validators = []
+
 
 class OrderCreateSerializer(serializers.ModelSerializer):
-    tickets = TicketSerializer(many=True, read_only=False, allow_empty=False)
+    tickets = OrderTicketSerializer(
+        many=True, read_only=False, allow_empty=False
+    )
 
     class Meta:
         model = Order
         fields = ("id", "created", "tickets")
 
+    def validate_tickets(self, tickets):
+        """
+        Validate all tickets against one flight/airplane lookup
+        and one query for already taken seats.
+        """
+        flights = Flight.objects.select_related("airplane").in_bulk(
+            {ticket["flight_id"] for ticket in tickets}
+        )
+        seats = set()
+        for ticket in tickets:
+            flight = flights.get(ticket["flight_id"])
+            if flight is None:
+                raise serializers.ValidationError(
+                    {
+                        "flight": f'Invalid pk "{ticket["flight_id"]}" '
+                        f"- object does not exist."
+                    }
+                )
+            Ticket.validate_ticket(
+                row=ticket["row"],
+                seat=ticket["seat"],
+                rows=flight.airplane.rows,
+                seats=flight.airplane.seats_in_row,
+                error_to_rase=serializers.ValidationError,
+            )
+            seat = (ticket["row"], ticket["seat"], flight.id)
+            if seat in seats:
+                raise serializers.ValidationError(
+                    f"row: {seat[0]} seat: {seat[1]} is ordered twice "
+                    f"for flight {seat[2]}."
+                )
+            seats.add(seat)
+
+        taken = Ticket.objects.filter(_seats_q(seats)).first()
+        if taken is not None:
+            raise serializers.ValidationError(
+                f"{taken} is already taken for flight {taken.flight_id}."
+            )
+        held = (
+            SeatHold.objects.filter(
+                _seats_q(seats), expires_at__gt=timezone.now()
+            )
+            .exclude(user=self.context["request"].user)
+            .first()
+        )
+        if held is not None:
+            raise serializers.ValidationError(
+                f"{held} is held by another customer "
+                f"for flight {held.flight_id}."
+            )
+        return tickets
+
     def create(self, validated_data):
-        with transaction.atomic():
-            tickets_data = validated_data.pop("tickets")
-            order = Order.objects.create(**validated_data)
-            for ticket_data in tickets_data:
-                order.tickets.add(
-                    Ticket.objects.create(order=order, **ticket_data)
+        tickets_data = validated_data.pop("tickets")
+        try:
+            with transaction.atomic():
+                order = Order.objects.create(**validated_data)
+                SeatHold.objects.filter(
+                    _seats_q(
+                        (ticket["row"], ticket["seat"], ticket["flight_id"])
+                        for ticket in tickets_data
+                    ),
+                    user=order.user,
+                ).delete()
+                Ticket.objects.bulk_create(
+                    [
+                        Ticket(order=order, **ticket_data)
+                        for ticket_data in tickets_data
+                    ]
+                )
+                seats_taken = Counter(
+                    ticket_data["flight_id"] for ticket_data in tickets_data
                 )
-            return order
+                for flight_id, count in seats_taken.items():
+                    Flight.change_seats_taken(flight_id, count)
+        except IntegrityError:
+            raise serializers.ValidationError(
+                {"tickets": "Some of the seats have just been taken."}
+            )
+        return order
+
+
+class CacheStatsSerializer(serializers.Serializer):
+    hits = serializers.IntegerField()
+    misses = serializers.IntegerField()
+    hit_rate = serializers.FloatField()
+    invalidations = serializers.IntegerField()
+
+
+class PoolStatsSerializer(serializers.Serializer):
+    pool_min = serializers.IntegerField()
+    pool_max = serializers.IntegerField()
+    pool_size = serializers.IntegerField()
+    pool_available = serializers.IntegerField()
+    requests_waiting = serializers.IntegerField()
+    requests_num = serializers.IntegerField()
+    requests_queued = serializers.IntegerField()
+    requests_wait_ms = serializers.IntegerField()
+    requests_errors = serializers.IntegerField()
+    connections_num = serializers.IntegerField()
+    connections_ms = serializers.IntegerField()
+    connections_errors = serializers.IntegerField()
+    connections_lost = serializers.IntegerField()
+    avg_wait_ms = serializers.FloatField()
+
+
+class HealthSerializer(serializers.Serializer):
+    status = serializers.ChoiceField(choices=("ok", "unavailable"))
@@ -0,0 +1,178 @@
+from django.db import transaction
+from django.db.models import Count, Q, QuerySet
+from django.db.models.signals import (
+    m2m_changed,
+    post_save,
+    post_delete,
+    pre_delete,
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from airport.cache import invalidate
+from airport.models import (
+    Airplane,
+    AirplaneType,
+    Airport,
+    City,
+    Country,
+    Crew,
+    Flight,
+    Order,
+    Route,
+    Ticket,
+)
+from airport.route_graph import route_graph
+
+
+def touch(queryset) -> None:
+    """Move updated_at of rows whose representation changed elsewhere,
+    so their ETag and Last-Modified change too."""
+    queryset.update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Ticket)
+def increase_seats_taken(sender, instance, created, **kwargs):
+    if created:
+        Flight.change_seats_taken(instance.flight_id, 1)
+    else:
+        touch(Flight.objects.filter(pk=instance.flight_id))
+
+
+@receiver(post_delete, sender=Ticket)
+def decrease_seats_taken(sender, instance, origin=None, **kwargs):
+    # tickets cascaded from an order were released by
+    # release_order_seats(), those of a deleted flight need no release
+    if isinstance(origin, Ticket) or (
+        isinstance(origin, QuerySet) and origin.model is Ticket
+    ):
+        Flight.change_seats_taken(instance.flight_id, -1)
+
+
+@receiver(pre_delete, sender=Order)
+def release_order_seats(sender, instance, **kwargs):
+    """Release the seats of the order's cascaded tickets with one UPDATE
+    per flight instead of one per ticket."""
+    flights = (
+        instance.tickets.order_by()
+        .values("flight_id")
+        .annotate(count=Count("id"))
+    )
+    for flight in flights:
+        Flight.change_seats_taken(flight["flight_id"], -flight["count"])
+
+
+@receiver(post_save, sender=Airplane)
+def update_seats_total(sender, instance, created, **kwargs):
+    if not created:
+        instance.flights.update(
+            seats_total=instance.rows * instance.seats_in_row,
+            updated_at=timezone.now(),
+        )
+
+
+@receiver(post_save, sender=Flight)
+def add_flight_to_route_graph(sender, instance, **kwargs):
+    transaction.on_commit(
+        lambda: route_graph.add_flight(
+            instance.id,
+            instance.route.source_id,
+            instance.route.destination_id,
+            instance.departure_time,
+            instance.arrival_time,
+        )
+    )
+
+
+@receiver(post_delete, sender=Flight)
+def remove_flight_from_route_graph(sender, instance, **kwargs):
+    transaction.on_commit(lambda: route_graph.remove_flight(instance.id))
+
+
+@receiver(post_save, sender=Route)
+def move_route_flights_in_route_graph(sender, instance, created, **kwargs):
+    if created or route_graph.built_at is None:
+        return
+    flights = list(
+        instance.flights.values_list("id", "departure_time", "arrival_time")
+    )
+
+    def move_flights():
+        for flight_id, departure_time, arrival_time in flights:
+            route_graph.add_flight(
+                flight_id,
+                instance.source_id,
+                instance.destination_id,
+                departure_time,
+                arrival_time,
+            )
+
+    transaction.on_commit(move_flights)
+
+
+@receiver(post_save, sender=Country)
+@receiver(post_save, sender=City)
+@receiver(post_save, sender=Airport)
+def refresh_route_descriptions(sender, instance, created, **kwargs):
+    """Relabel every route touching the renamed place in one UPDATE."""
+    if created:
+        return
+    lookup = {
+        Airport: "",
+        City: "__closest_big_city",
+        Country: "__closest_big_city__country",
+    }[sender]
+    routes = Route.objects.filter(
+        Q(**{f"source{lookup}": instance})
+        | Q(**{f"destination{lookup}": instance})
+    )
+    routes.update(
+        route_description=Route.description_expression(),
+        updated_at=timezone.now(),
+    )
+    touch(Flight.objects.filter(route__in=routes))
+    if sender is not Airport:
+        touch(Airport.objects.filter(**{lookup.lstrip("_"): instance}))
+
+
+@receiver(post_save, sender=Route)
+def touch_route_flights(sender, instance, created, **kwargs):
+    if not created:
+        touch(instance.flights.all())
+
+
+@receiver(post_save, sender=Crew)
+@receiver(pre_delete, sender=Crew)
+def touch_crew_flights(sender, instance, **kwargs):
+    if instance.pk is not None:
+        touch(instance.flight_set.all())
+
+
+@receiver(m2m_changed, sender=Flight.crew.through)
+def touch_flights_of_changed_crew(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    if not reverse:
+        touch(Flight.objects.filter(pk=instance.pk))
+    elif pk_set:
+        touch(Flight.objects.filter(pk__in=pk_set))
+    else:
+        touch(instance.flight_set.all())
+
+
+@receiver(post_save, sender=AirplaneType)
+@receiver(post_save, sender=Airplane)
+@receiver(post_save, sender=Country)
+@receiver(post_save, sender=City)
+@receiver(post_save, sender=Airport)
+@receiver(post_save, sender=Route)
+@receiver(post_delete, sender=AirplaneType)
+@receiver(post_delete, sender=Airplane)
+@receiver(post_delete, sender=Country)
+@receiver(post_delete, sender=City)
+@receiver(post_delete, sender=Airport)
+@receiver(post_delete, sender=Route)
+def invalidate_cached_responses(sender, **kwargs):
+    invalidate(sender)
@@ -1,8 +1,10 @@
 from datetime import datetime
+from unittest import mock
 
 from django.contrib.auth import get_user_model
+from django.db import IntegrityError
 from django.test import TestCase
-from django.db.models import Count
+from django.db.models import Count, QuerySet
 
 from rest_framework.test import APIClient
 from rest_framework import status
@@ -97,7 +99,7 @@ def sample_route() -> Route:
         source=airport1, destination=airport2, distance=1000
     )
     Route.objects.create(source=airport2, destination=airport3, distance=1000)
-    Route.objects.create(source=airport3, destination=airport4, distance=1000)
+    Route.objects.create(source=airport4, destination=airport3, distance=1000)
     Route.objects.create(source=airport4, destination=airport1, distance=1000)
     return route
 
@@ -294,6 +296,44 @@ class CountryTests(TestCase):
         self.assertTrue(Country.objects.filter(name=data["name"]).exists())
         self.assertEqual(len(Country.objects.all()), 2)
 
+    def test_bulk_upsert_countries(self):
+        self.client.get(self.list_url)
+        data = [{"name": self.country.name}, {"name": "Poland"}]
+        response = self.client.post(self.list_url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data[0]["id"], self.country.id)
+        self.assertEqual(Country.objects.count(), 2)
+        response = self.client.get(self.list_url)
+        self.assertEqual(len(response.data["results"]), 2)
+
+        response = self.client.post(
+            self.list_url, [{"name": "Chile"}, {"name": ""}], format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Country.objects.filter(name="Chile").exists())
+
+    def test_bulk_upsert_rolls_back_every_batch(self):
+        bulk_create = QuerySet.bulk_create
+        calls = []
+
+        def fail_second_batch(queryset, *args, **kwargs):
+            calls.append(args)
+            if len(calls) == 2:
+                raise IntegrityError("duplicate key value")
+            return bulk_create(queryset, *args, **kwargs)
+
+        with mock.patch("airport.bulk.BATCH_SIZE", 1), mock.patch.object(
+            QuerySet, "bulk_create", fail_second_batch
+        ):
+            response = self.client.post(
+                self.list_url,
+                [{"name": "Chile"}, {"name": "Peru"}],
+                format="json",
+            )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("duplicate key value", str(response.data))
+        self.assertEqual(Country.objects.count(), 1)
+
     def test_retrive_country(self):
         response = self.client.get(self.detail_url)
         serializer = CountryListSerializer(self.country)
@@ -317,6 +357,19 @@ class CountryTests(TestCase):
         self.assertTrue(Country.objects.filter(name=data["name"]).exists())
         self.assertEqual(len(Country.objects.all()), 1)
 
+    def test_put_country_refreshes_cached_detail(self):
+        self.client.get(self.detail_url)
+        self.client.put(self.detail_url, {"name": "New"}, format="json")
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response.data["name"], "New")
+
+        response = self.client.get(reverse("airport:cache-stats"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            set(response.data),
+            {"hits", "misses", "hit_rate", "invalidations"},
+        )
+
 
 ############################################################
 class CityTests(TestCase):
@@ -345,6 +398,22 @@ class CityTests(TestCase):
         self.assertTrue(City.objects.filter(name=data["name"]).exists())
         self.assertEqual(len(City.objects.all()), 2)
 
+    def test_bulk_upsert_cities_resolves_countries_at_once(self):
+        other = Country.objects.create(name="Poland")
+        data = [
+            {"name": f"City {i}", "country": (self.country, other)[i % 2].id}
+            for i in range(200)
+        ]
+        with self.assertNumQueries(5):
+            response = self.client.post(self.list_url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(City.objects.filter(country=other).count(), 100)
+
+        data = [{"name": "Krakow", "country": other.id + 100}]
+        response = self.client.post(self.list_url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("does not exist", str(response.data))
+
     def test_retrive_city(self):
         response = self.client.get(self.detail_url)
         serializer = CityListSerializer(self.city)
@@ -426,6 +495,25 @@ class RouteTests(TestCase):
             "airport:route-detail", kwargs={"pk": self.route.pk}
         )
 
+    def test_rename_refreshes_route_description(self):
+        city = City.objects.get(name="New York")
+        response = self.client.patch(
+            reverse("airport:city-detail", kwargs={"pk": city.pk}),
+            {"name": "Albany"},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.patch(
+            reverse("airport:country-detail", kwargs={"pk": city.country.pk}),
+            {"name": "United States"},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.route.refresh_from_db()
+        self.assertEqual(
+            self.route.route_description,
+            "From NYA (Albany / United States) to FA (Fargo / United States)",
+        )
+        self.assertEqual(str(self.route), self.route.route_description)
+
     def test_list_routs(self):
         response = self.client.get(self.list_url)
         routs = Route.objects.all()
@@ -490,6 +578,27 @@ class RouteTests(TestCase):
         )
         self.assertEqual(len(Route.objects.all()), 4)
 
+    def test_put_route_duplicate_airports(self):
+        data = {"source": 2, "destination": 3, "distance": 100}
+        response = self.client.put(self.detail_url, data)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_upsert_routes(self):
+        data = [
+            {"source": 1, "destination": 2, "distance": 1500},
+            {"source": 1, "destination": 3, "distance": 2000},
+            {"source": 1, "destination": 3, "distance": 2100},
+        ]
+        response = self.client.post(self.list_url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [route["distance"] for route in response.data], [1500, 2100]
+        )
+        self.assertEqual(response.data[0]["id"], self.route.id)
+        self.assertEqual(Route.objects.count(), 5)
+        created = Route.objects.get(source=1, destination=3)
+        self.assertIn("NYA", created.route_description)
+
     def test_putch_route(self):
         data = {"distance": 3333}
         response = self.client.patch(self.detail_url, data)
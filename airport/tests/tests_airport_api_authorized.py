@@ -1,8 +1,17 @@
-from datetime import datetime
+import base64
+from collections import Counter
+from datetime import datetime, time, timedelta
+from io import StringIO
+from unittest import mock
 
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import DatabaseError, connection, transaction
 from django.db.models import Count
+from django.db.models.signals import post_init
+from django.utils import timezone
 
 from rest_framework.test import APIClient
 from rest_framework import status
@@ -19,6 +28,7 @@ from airport.models import (
     Ticket,
     Flight,
     Order,
+    SeatHold,
 )
 from airport.serializers import (
     AirplaneTypeSerializer,
@@ -33,7 +43,11 @@ from airport.serializers import (
     OrderListSerializer,
     OrderListSerializer,
     OrderCreateSerializer,
+    SeatMapSerializer,
 )
+from airport.cache import get_cache, get_stats
+from airport.pagination import after
+from airport.route_graph import route_graph
 
 BASE_URL = reverse("airport:api-root")
 
@@ -237,6 +251,24 @@ class CountryTests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["results"], serializer.data)
 
+    def test_list_countries_cached(self):
+        get_cache().clear()
+        self.client.get(self.list_url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.list_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        City.objects.create(name="Wellington", country=self.country)
+        response = self.client.get(self.list_url)
+        self.assertEqual(response.data["results"][0]["cities"], ["Wellington"])
+        stats = get_stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 2))
+        self.assertEqual(stats["invalidations"], 1)
+
+    def test_cache_stats_admin_only(self):
+        response = self.client.get(reverse("airport:cache-stats"))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
     def test_post_country(self):
         data = {"name": "United country of Eirth"}
         response = self.client.post(self.list_url, data)
@@ -319,6 +351,27 @@ class AirportTests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["results"], serializer.data)
 
+    def test_airport_etag_follows_city_rename(self):
+        etag = self.client.get(self.detail_url)["ETag"]
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.city.name = "Lviv"
+        self.city.save()
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["closest_big_city"]["name"], "Lviv")
+
+    def test_list_airports_not_modified(self):
+        etag = self.client.get(self.list_url)["ETag"]
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        Airport.objects.create(name="UWR", closest_big_city=self.city)
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 2)
+
     def test_post_airport(self):
         data = {"name": "UWR", "closest_big_city": self.city.pk}
         response = self.client.post(self.list_url, data)
@@ -474,6 +527,167 @@ class FlightTests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["results"], serializer.data)
 
+    def test_list_flights_queries(self):
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.bulk_create(
+            [
+                Ticket(row=row, seat=seat, flight=self.flight, order=order)
+                for row in range(1, 21)
+                for seat in range(1, 5)
+            ]
+        )
+        instances = Counter()
+
+        def count_instance(sender, **kwargs):
+            instances[sender] += 1
+
+        post_init.connect(count_instance)
+        try:
+            # the page alone, the ETag is derived from it
+            with self.assertNumQueries(1):
+                response = self.client.get(self.list_url)
+        finally:
+            post_init.disconnect(count_instance)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn(Ticket, instances)
+        self.assertNotIn(Crew, instances)
+        self.assertEqual(instances[Flight], len(response.data["results"]))
+
+    def test_list_flights_not_modified(self):
+        response = self.client.get(self.list_url)
+        etag = response["ETag"]
+        # ids and timestamps of the page only, nothing is serialized
+        with self.assertNumQueries(1), mock.patch.object(
+            FlightListSerializer, "to_representation"
+        ) as to_representation:
+            response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+        to_representation.assert_not_called()
+
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(row=1, seat=1, flight=self.flight, order=order)
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_retrive_flight_not_modified(self):
+        response = self.client.get(self.detail_url)
+        last_modified = response["Last-Modified"]
+        response = self.client.get(
+            self.detail_url, HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        response = self.client.get(
+            self.detail_url + "seat-map/",
+            HTTP_IF_NONE_MATCH=response["ETag"],
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response["ETag"]
+        with mock.patch.object(
+            SeatMapSerializer, "to_representation"
+        ) as to_representation:
+            response = self.client.get(
+                self.detail_url + "seat-map/", HTTP_IF_NONE_MATCH=etag
+            )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        to_representation.assert_not_called()
+
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(row=1, seat=1, flight=self.flight, order=order)
+        response = self.client.get(
+            self.detail_url + "seat-map/", HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_list_flights_cursor_pagination(self):
+        response = self.client.get(
+            self.list_url, {"limit": 2, "count": "true"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], Flight.objects.count())
+        ids = [flight["id"] for flight in response.data["results"]]
+        response = self.client.get(response.data["next"])
+        self.assertIsNone(response.data["next"])
+        ids += [flight["id"] for flight in response.data["results"]]
+        self.assertEqual(
+            ids,
+            list(
+                Flight.objects.order_by("departure_time", "id").values_list(
+                    "id", flat=True
+                )
+            ),
+        )
+        response = self.client.get(self.list_url)
+        self.assertNotIn("count", response.data)
+
+    def test_list_flights_cursor_with_same_departure_time(self):
+        for _ in range(5):
+            Flight.objects.create(
+                route=self.flight.route,
+                airplane=self.flight.airplane,
+                departure_time=self.flight.departure_time,
+                arrival_time=self.flight.arrival_time,
+            )
+        expected = list(
+            Flight.objects.order_by("departure_time", "id").values_list(
+                "id", flat=True
+            )
+        )
+        ids, pages = [], []
+        url = self.list_url + "?limit=2"
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            if pages:
+                # the scan of the (departure_time, id) index is bounded
+                self.assertIn(
+                    '"airport_flight"."departure_time" >= ',
+                    queries[-1]["sql"],
+                )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            pages.append([flight["id"] for flight in response.data["results"]])
+            ids += pages[-1]
+            url = response.data["next"]
+        self.assertEqual(ids, expected)
+
+        previous = response.data["previous"]
+        for page in reversed(pages[:-1]):
+            response = self.client.get(previous)
+            self.assertEqual(
+                [flight["id"] for flight in response.data["results"]], page
+            )
+            previous = response.data["previous"]
+        self.assertIsNone(previous)
+
+        response = self.client.get(self.list_url, {"cursor": "broken"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_keyset_filter_bounds_leading_field(self):
+        self.flight.refresh_from_db()
+        departure_time = self.flight.departure_time
+        sql = str(
+            Flight.objects.filter(
+                after(("-departure_time", "-id"), [departure_time, 3])
+            ).query
+        )
+        self.assertIn('"airport_flight"."departure_time" <= ', sql)
+        flights = Flight.objects.order_by("departure_time", "id")
+        self.assertEqual(
+            list(
+                flights.filter(
+                    after(("departure_time", "id"), [departure_time, 1])
+                )
+            ),
+            [
+                flight
+                for flight in flights
+                if (flight.departure_time, flight.id) > (departure_time, 1)
+            ],
+        )
+
     def test_list_flights_filtred(self):
         response = self.client.get(self.list_url + "?countries=us-uk")
         flights = Flight.objects.filter(
@@ -492,6 +706,52 @@ class FlightTests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data["results"], serializer.data)
 
+    def test_list_flights_filtred_by_departure(self):
+        later = Flight.objects.create(
+            route=self.flight.route,
+            airplane=self.flight.airplane,
+            departure_time=datetime(2025, 1, 16, 23, 30),
+            arrival_time=datetime(2025, 1, 17, 2, 0),
+        )
+        response = self.client.get(self.list_url, {"date": "2025-01-16"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [flight["id"] for flight in response.data["results"]], [later.id]
+        )
+
+        response = self.client.get(
+            self.list_url,
+            {
+                "departure_after": "2025-01-15",
+                "departure_before": "2025-01-15T10:00",
+                "airports": "1-2",
+            },
+        )
+        self.assertEqual(
+            [flight["id"] for flight in response.data["results"]],
+            [self.flight.id],
+        )
+
+        response = self.client.get(self.list_url, {"date": "tomorrow"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_route_departure_search_uses_index(self):
+        index = next(
+            index.name
+            for index in Flight._meta.indexes
+            if index.fields == ["route", "departure_time"]
+        )
+        if connection.vendor == "postgresql":
+            # the test table is tiny, so make the planner show its choice
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan TO off")
+        plan = Flight.objects.filter(
+            route=self.flight.route,
+            departure_time__gte=datetime(2025, 1, 15),
+            departure_time__lt=datetime(2025, 1, 16),
+        ).explain()
+        self.assertIn(index, plan)
+
     def test_post_flights(self):
         data = {
             "route": 1,
@@ -508,6 +768,117 @@ class FlightTests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data, serializer.data)
 
+    def test_retrive_flight_available_tickets(self):
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(row=1, seat=2, flight=self.flight, order=order)
+        response = self.client.get(self.detail_url)
+        airplane = self.flight.airplane
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["taken_tickets"], ["row: 1 seat: 2"])
+        self.assertNotIn("row: 1 seat: 2", response.data["available_tickets"])
+        self.assertEqual(
+            len(response.data["available_tickets"]),
+            airplane.rows * airplane.seats_in_row - 1,
+        )
+
+    def test_flight_seat_map(self):
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(row=1, seat=2, flight=self.flight, order=order)
+        Ticket.objects.create(row=3, seat=1, flight=self.flight, order=order)
+        response = self.client.get(self.detail_url + "seat-map/")
+        airplane = self.flight.airplane
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["rows"], airplane.rows)
+        self.assertEqual(response.data["seats_in_row"], airplane.seats_in_row)
+        self.assertEqual(response.data["taken_tickets"], 2)
+        bits = int.from_bytes(
+            base64.b64decode(response.data["bitmap"]), "little"
+        )
+        taken = [
+            divmod(index, airplane.seats_in_row)
+            for index in range(airplane.rows * airplane.seats_in_row)
+            if bits >> index & 1
+        ]
+        self.assertEqual(taken, [(0, 1), (2, 0)])
+
+    def test_flight_seat_counters(self):
+        airplane = self.flight.airplane
+        self.assertEqual(
+            self.flight.seats_total, airplane.rows * airplane.seats_in_row
+        )
+        data = {
+            "tickets": [
+                {"row": 1, "seat": 1, "flight": self.flight.id},
+                {"row": 1, "seat": 2, "flight": self.flight.id},
+            ]
+        }
+        response = self.client.post(
+            reverse("airport:order-list"), data, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.seats_taken, 2)
+
+        Ticket.objects.filter(row=1, seat=1).delete()
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.seats_taken, 1)
+
+        Flight.objects.update(seats_taken=0, seats_total=0)
+        call_command("reconcile_seat_counters", stdout=StringIO())
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.seats_taken, 1)
+        self.assertEqual(
+            self.flight.seats_total, airplane.rows * airplane.seats_in_row
+        )
+
+    def test_delete_order_releases_seats_per_flight(self):
+        order = Order.objects.create(user=self.user)
+        for seat in (1, 2, 3):
+            Ticket.objects.create(
+                row=1, seat=seat, flight=self.flight, order=order
+            )
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.seats_taken, 3)
+
+        with CaptureQueriesContext(connection) as queries:
+            order.delete()
+        flight_updates = [
+            query
+            for query in queries
+            if query["sql"].startswith('UPDATE "airport_flight"')
+        ]
+        self.assertEqual(len(flight_updates), 1)
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.seats_taken, 0)
+
+    def test_delete_ticket_after_rolled_back_order_delete(self):
+        order = Order.objects.create(user=self.user)
+        ticket = Ticket.objects.create(
+            row=1, seat=1, flight=self.flight, order=order
+        )
+        try:
+            with transaction.atomic():
+                order.delete()
+                raise DatabaseError("rolled back")
+        except DatabaseError:
+            pass
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.seats_taken, 1)
+
+        ticket.delete()
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.seats_taken, 0)
+
+    def test_save_keeps_concurrent_seats_taken(self):
+        stale = Flight.objects.get(pk=self.flight.pk)
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(row=1, seat=1, flight=self.flight, order=order)
+        stale.departure_time = datetime(2025, 1, 15, 9, 0)
+        stale.save()
+        self.flight.refresh_from_db()
+        self.assertEqual(self.flight.seats_taken, 1)
+        self.assertEqual(self.flight.departure_time.hour, 9)
+
     def test_put_flight(self):
         data = {
             "route": 1,
@@ -524,6 +895,99 @@ class FlightTests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
 
+class ItineraryTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_auth_user()
+        self.client.force_authenticate(self.user)
+        sample_route()
+        airplane = sample_airplane()
+        self.day = timezone.localdate() + timedelta(days=7)
+
+        def flight(route_pk, departure_hour, arrival_hour, minute=0):
+            start = timezone.make_aware(datetime.combine(self.day, time()))
+            return Flight.objects.create(
+                route=Route.objects.get(pk=route_pk),
+                airplane=airplane,
+                departure_time=start
+                + timedelta(hours=departure_hour, minutes=minute),
+                arrival_time=start + timedelta(hours=arrival_hour),
+            )
+
+        # NYA -> FA -> HA with a 1h connection, the same with a 10 minute
+        # connection, and a slow direct NYA -> HA route
+        self.first_leg = flight(1, 8, 10)
+        self.second_leg = flight(2, 11, 13)
+        flight(2, 10, 12, minute=10)
+        direct_route = Route.objects.create(
+            source=Airport.objects.get(name="NYA"),
+            destination=Airport.objects.get(name="HA"),
+            distance=2000,
+        )
+        self.direct = flight(direct_route.pk, 12, 20)
+        route_graph.build()
+        self.url = reverse("airport:itinerary")
+
+    def test_itineraries_ordered_by_arrival(self):
+        response = self.client.get(
+            self.url,
+            {
+                "source": Airport.objects.get(name="NYA").pk,
+                "destination": Airport.objects.get(name="HA").pk,
+                "date": self.day,
+            },
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [
+                [flight["id"] for flight in itinerary["flights"]]
+                for itinerary in response.data
+            ],
+            [[self.first_leg.id, self.second_leg.id], [self.direct.id]],
+        )
+        self.assertEqual(response.data[0]["connections"], 1)
+
+    def test_itineraries_without_connections(self):
+        response = self.client.get(
+            self.url,
+            {
+                "source": Airport.objects.get(name="NYA").pk,
+                "destination": Airport.objects.get(name="HA").pk,
+                "date": self.day,
+                "max_connections": 0,
+            },
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(response.data[0]["flights"][0]["id"], self.direct.id)
+
+    def test_route_graph_follows_flight_changes(self):
+        params = {
+            "source": Airport.objects.get(name="NYA").pk,
+            "destination": Airport.objects.get(name="HA").pk,
+            "date": self.day,
+            "max_connections": 0,
+        }
+        with self.captureOnCommitCallbacks(execute=True):
+            self.direct.delete()
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.data, [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.first_leg.route = Route.objects.get(
+                source__name="NYA", destination__name="HA"
+            )
+            self.first_leg.save()
+        response = self.client.get(self.url, params)
+        self.assertEqual(
+            response.data[0]["flights"][0]["id"], self.first_leg.id
+        )
+
+    def test_itinerary_requires_airports(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
 class OrderTests(TestCase):
     def setUp(self):
         self.client = APIClient()
@@ -551,6 +1015,20 @@ class OrderTests(TestCase):
         self.assertEqual(response.data["results"], serializer.data)
         self.assertEqual(len(response.data["results"]), 1)
 
+    def test_list_order_with_tickets_queries(self):
+        for row in range(1, 6):
+            order = Order.objects.create(user=self.user)
+            for seat in range(1, 4):
+                Ticket.objects.create(
+                    row=row, seat=seat, flight=self.flight, order=order
+                )
+        with self.assertNumQueries(2):
+            response = self.client.get(self.list_url)
+        orders = Order.objects.filter(user=self.user)
+        serializer = OrderListSerializer(orders, many=True)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["results"], serializer.data)
+
     def test_post_order(self):
         data = {
             "tickets": [
@@ -587,6 +1065,73 @@ class OrderTests(TestCase):
         response = self.client.post(self.list_url, data, format="json")
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
+    def test_post_order_constant_queries(self):
+        def post_order(row, seats):
+            data = {
+                "tickets": [
+                    {"row": row, "seat": seat, "flight": self.flight.id}
+                    for seat in range(1, seats + 1)
+                ]
+            }
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(self.list_url, data, format="json")
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            return len(queries)
+
+        self.assertEqual(
+            post_order(row=1, seats=1), post_order(row=2, seats=4)
+        )
+        self.assertEqual(Ticket.objects.count(), 5)
+
+    def test_post_order_duplicate_seat(self):
+        data = {
+            "tickets": [
+                {"row": 1, "seat": 1, "flight": self.flight.id},
+                {"row": 1, "seat": 1, "flight": self.flight.id},
+            ]
+        }
+        response = self.client.post(self.list_url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Ticket.objects.count(), 0)
+
+    def test_hold_seats_then_order(self):
+        hold_url = reverse(
+            "airport:flight-hold", kwargs={"pk": self.flight.pk}
+        )
+        seats = {"seats": [{"row": 2, "seat": 1}, {"row": 2, "seat": 2}]}
+        response = self.client.post(hold_url, seats, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data["seats"]), 2)
+        self.assertEqual(SeatHold.objects.filter(user=self.user).count(), 2)
+
+        data = {"tickets": [{"row": 2, "seat": 1, "flight": self.flight.id}]}
+        self.client.force_authenticate(self.another_user)
+        response = self.client.post(hold_url, seats, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post(self.list_url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.client.force_authenticate(self.user)
+        response = self.client.post(self.list_url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(SeatHold.objects.filter(user=self.user).count(), 1)
+
+        response = self.client.delete(hold_url)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(SeatHold.objects.exists())
+
+    def test_expired_hold_does_not_block_order(self):
+        SeatHold.objects.create(
+            row=1,
+            seat=1,
+            flight=self.flight,
+            user=self.another_user,
+            expires_at=timezone.now() - timedelta(seconds=1),
+        )
+        data = {"tickets": [{"row": 1, "seat": 1, "flight": self.flight.id}]}
+        response = self.client.post(self.list_url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
     def test_retrive_order(self):
         response = self.client.get(self.detail_url)
         serializer = OrderListSerializer(self.order)
@@ -0,0 +1,95 @@
+from datetime import datetime
+
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from airport.models import Flight, Route
+from airport.tests.tests_airport_api_authorized import (
+    create_auth_user,
+    sample_flight,
+)
+
+
+class AsyncReadViewsTests(TestCase):
+    def setUp(self):
+        self.user = create_auth_user()
+        self.flight = sample_flight()
+        self.auth = {
+            "headers": {
+                "Authorization": f"Bearer {AccessToken.for_user(self.user)}"
+            }
+        }
+
+    async def test_flight_list_pages_with_cursor(self):
+        url = reverse("airport:async-flight-list")
+        response = await self.async_client.get(
+            url, {"limit": 2, "count": "true"}, **self.auth
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+        self.assertEqual(data["count"], await Flight.objects.acount())
+        ids = [flight["id"] for flight in data["results"]]
+
+        response = await self.async_client.get(data["next"], **self.auth)
+        data = response.json()
+        self.assertIsNone(data["next"])
+        ids += [flight["id"] for flight in data["results"]]
+        expected = Flight.objects.order_by("departure_time", "id")
+        self.assertEqual(
+            ids, [pk async for pk in expected.values_list("id", flat=True)]
+        )
+
+    async def test_flight_list_filters(self):
+        response = await self.async_client.get(
+            reverse("airport:async-flight-list"),
+            {"airports": "1-2", "date": "2025-01-15"},
+            **self.auth,
+        )
+        self.assertEqual(
+            [flight["id"] for flight in response.json()["results"]],
+            [self.flight.id],
+        )
+        response = await self.async_client.get(
+            reverse("airport:async-flight-list"),
+            {"cursor": "broken"},
+            **self.auth,
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    async def test_flight_detail_with_seat_map(self):
+        url = reverse(
+            "airport:async-flight-detail", kwargs={"pk": self.flight.pk}
+        )
+        response = await self.async_client.get(url, **self.auth)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+        self.assertEqual(data["id"], self.flight.id)
+        self.assertEqual(data["seat_map"]["taken_tickets"], 0)
+        self.assertEqual(
+            len(data["available_tickets"]),
+            data["seat_map"]["rows"] * data["seat_map"]["seats_in_row"],
+        )
+
+        url = reverse("airport:async-flight-detail", kwargs={"pk": 999})
+        response = await self.async_client.get(url, **self.auth)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_route_list(self):
+        response = await self.async_client.get(
+            reverse("airport:async-route-list"), **self.auth
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            len(response.json()["results"]), await Route.objects.acount()
+        )
+
+    async def test_requires_authentication_and_get(self):
+        url = reverse("airport:async-route-list")
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        response = await self.async_client.post(url, **self.auth)
+        self.assertEqual(
+            response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED
+        )
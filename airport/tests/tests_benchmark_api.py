@@ -0,0 +1,75 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from airport.models import Order, Ticket
+from airport.throttling import UserSlidingWindowThrottle
+from airport.tests.tests_airport_api_authorized import sample_flight
+
+
+class BenchmarkApiTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_superuser(
+            email="<ADMIN>", password="<PASSWORD>"
+        )
+        self.flight = sample_flight()
+        order = Order.objects.create(user=self.user)
+        Ticket.objects.create(row=1, seat=1, flight=self.flight, order=order)
+        self.results_file = tempfile.NamedTemporaryFile(
+            suffix=".json", delete=False
+        ).name
+
+    def tearDown(self):
+        os.remove(self.results_file)
+
+    def benchmark(self, **options):
+        call_command(
+            "benchmark_api",
+            iterations=2,
+            host="testserver",
+            stdout=StringIO(),
+            **options,
+        )
+
+    def test_benchmark_every_get_route(self):
+        self.benchmark(save=self.results_file)
+        with open(self.results_file) as file:
+            results = json.load(file)
+        self.assertIn("flight-list", results)
+        self.assertIn("flight-detail", results)
+        self.assertIn("flight-seat-map", results)
+        self.assertIn("order-detail", results)
+        # catalog endpoints are measured uncached and from the cache
+        self.assertGreater(results["country-list"]["queries"], 0)
+        self.assertEqual(results["country-list:cached"]["queries"], 0)
+        self.assertNotIn("flight-list:cached", results)
+        for name, result in results.items():
+            if not name.endswith(":cached"):
+                self.assertGreater(result["queries"], 0)
+            self.assertGreaterEqual(result["p95_ms"], result["p50_ms"])
+
+    @mock.patch.object(UserSlidingWindowThrottle, "rate", "1/day", create=True)
+    def test_benchmark_is_not_throttled(self):
+        self.benchmark(save=self.results_file)
+
+    def test_benchmark_fails_on_query_regression(self):
+        with open(self.results_file, "w") as file:
+            json.dump(
+                {
+                    "flight-list": {
+                        "queries": 0,
+                        "p50_ms": 1000,
+                        "p95_ms": 1000,
+                    }
+                },
+                file,
+            )
+        with self.assertRaisesMessage(CommandError, "flight-list"):
+            self.benchmark(baseline=self.results_file)
@@ -0,0 +1,103 @@
+import csv
+import json
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from airport.models import Order, Ticket
+from airport.tests.tests_airport_api_authorized import (
+    create_auth_user,
+    sample_flight,
+)
+from user.authentication import set_user_claims
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = get_user_model().objects.create_superuser(
+            email="admin@example.com", password="<PASSWORD>"
+        )
+        self.client.force_authenticate(self.admin)
+        self.user = create_auth_user()
+        self.flight = sample_flight()
+        self.order = Order.objects.create(user=self.user)
+        for seat in (2, 1):
+            Ticket.objects.create(
+                row=1, seat=seat, flight=self.flight, order=self.order
+            )
+
+    def export(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return b"".join(response.streaming_content).decode()
+
+    def test_export_tickets_csv(self):
+        url = reverse(
+            "airport:export",
+            kwargs={"resource": "tickets", "file_format": "csv"},
+        )
+        rows = list(csv.DictReader(StringIO(self.export(url))))
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[0]["email"], self.user.email)
+        self.assertEqual(rows[0]["flight"], str(self.flight.id))
+
+    async def test_export_streams_asynchronously_under_asgi(self):
+        url = reverse(
+            "airport:export",
+            kwargs={"resource": "tickets", "file_format": "csv"},
+        )
+        token = AccessToken.for_user(self.admin)
+        set_user_claims(token, self.admin)
+        response = await self.async_client.get(
+            url, headers={"Authorization": f"Bearer {token}"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # not loaded into a list by StreamingHttpResponse.__aiter__
+        self.assertTrue(response.is_async)
+        content = b"".join(
+            [chunk async for chunk in response.streaming_content]
+        ).decode()
+        rows = list(csv.DictReader(StringIO(content)))
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[0]["email"], self.user.email)
+
+    def test_export_orders_ndjson(self):
+        url = reverse(
+            "airport:export",
+            kwargs={"resource": "orders", "file_format": "ndjson"},
+        )
+        orders = [json.loads(line) for line in self.export(url).splitlines()]
+        self.assertEqual(len(orders), 1)
+        self.assertEqual(orders[0]["id"], self.order.id)
+        self.assertEqual(orders[0]["tickets"], 2)
+
+    def test_export_flight_manifest(self):
+        url = reverse(
+            "airport:flight-manifest-export",
+            kwargs={"pk": self.flight.pk, "file_format": "csv"},
+        )
+        rows = list(csv.DictReader(StringIO(self.export(url))))
+        self.assertEqual([row["seat"] for row in rows], ["1", "2"])
+        self.assertEqual(rows[0]["last_name"], self.user.last_name)
+
+        url = reverse(
+            "airport:flight-manifest-export",
+            kwargs={"pk": 999, "file_format": "csv"},
+        )
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_export_staff_only(self):
+        self.client.force_authenticate(self.user)
+        url = reverse(
+            "airport:export",
+            kwargs={"resource": "tickets", "file_format": "csv"},
+        )
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
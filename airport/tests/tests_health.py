@@ -0,0 +1,159 @@
+from unittest import mock
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.base.base import NO_DB_ALIAS
+from django.test import SimpleTestCase, TestCase
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from airport.tests import tests_airport_api_admin, tests_airport_api_authorized
+from django.db.backends.postgresql import creation
+from service_config.postgresql_pool.base import DatabaseWrapper
+
+POOLED_DATABASE = {
+    "ENGINE": "service_config.postgresql_pool",
+    "NAME": "airport",
+    "USER": "",
+    "PASSWORD": "",
+    "HOST": "",
+    "PORT": "",
+    "CONN_MAX_AGE": 0,
+    "TIME_ZONE": None,
+    "OPTIONS": {"pool": {"min_size": 1, "max_size": 4}},
+}
+
+
+class HealthApiTests(TestCase):
+    def test_health_is_public(self):
+        response = APIClient().get(reverse("airport:health"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {"status": "ok"})
+
+    @mock.patch("airport.views.check_database", return_value=False)
+    def test_health_reports_unavailable_database(self, check_database):
+        response = APIClient().get(reverse("airport:health"))
+        self.assertEqual(
+            response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+        self.assertEqual(response.data, {"status": "unavailable"})
+
+    def test_pool_stats_need_staff(self):
+        client = APIClient()
+        url = reverse("airport:pool-stats")
+        response = client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        client.force_authenticate(
+            tests_airport_api_authorized.create_auth_user()
+        )
+        response = client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_pool_stats(self):
+        client = APIClient()
+        client.force_authenticate(tests_airport_api_admin.create_auth_user())
+        url = reverse("airport:pool-stats")
+        # the test database is not pooled
+        response = client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        pooled = mock.Mock()
+        pooled.pool.get_stats.return_value = {
+            "pool_min": 1,
+            "pool_max": 4,
+            "pool_size": 2,
+            "requests_num": 4,
+            "requests_wait_ms": 10,
+        }
+        with mock.patch.dict("airport.health.connections", default=pooled):
+            response = client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["pool_size"], 2)
+        # counters still at zero are left out by psycopg_pool
+        self.assertEqual(response.data["requests_waiting"], 0)
+        self.assertEqual(response.data["avg_wait_ms"], 2.5)
+
+
+class PooledDatabaseWrapperTests(SimpleTestCase):
+    def test_pool_needs_conn_max_age_zero(self):
+        wrapper = DatabaseWrapper({**POOLED_DATABASE, "CONN_MAX_AGE": 60})
+        with self.assertRaises(ImproperlyConfigured):
+            wrapper.pool
+
+    def test_no_pool_without_option_or_database(self):
+        self.assertIsNone(
+            DatabaseWrapper({**POOLED_DATABASE, "OPTIONS": {}}).pool
+        )
+        self.assertIsNone(DatabaseWrapper(POOLED_DATABASE, NO_DB_ALIAS).pool)
+
+    def test_pool_option_is_not_a_connection_parameter(self):
+        params = DatabaseWrapper(POOLED_DATABASE).get_connection_params()
+        self.assertNotIn("pool", params)
+        self.assertEqual(params["dbname"], "airport")
+
+
+@mock.patch.dict(DatabaseWrapper._connection_pools, clear=True)
+@mock.patch("service_config.postgresql_pool.base.ConnectionPool")
+class PooledConnectionTests(SimpleTestCase):
+    def test_pool_is_opened_once_per_database(self, ConnectionPool):
+        pool = DatabaseWrapper(POOLED_DATABASE).pool
+        self.assertIs(DatabaseWrapper(POOLED_DATABASE).pool, pool)
+        ConnectionPool.assert_called_once()
+        kwargs = ConnectionPool.call_args.kwargs
+        self.assertFalse(kwargs["open"])
+        self.assertEqual(kwargs["kwargs"]["dbname"], "airport")
+        self.assertEqual((kwargs["min_size"], kwargs["max_size"]), (1, 4))
+        pool.open.assert_called_once_with()
+
+        # the test runner renames the database
+        other = DatabaseWrapper({**POOLED_DATABASE, "NAME": "test_airport"})
+        self.assertIsNotNone(other.pool)
+        self.assertEqual(ConnectionPool.call_count, 2)
+
+    def test_connection_is_returned_on_close(self, ConnectionPool):
+        pool = ConnectionPool.return_value
+        wrapper = DatabaseWrapper(POOLED_DATABASE)
+        connection = wrapper.get_new_connection({})
+        self.assertIs(connection, pool.getconn.return_value)
+
+        wrapper.connection = connection
+        wrapper._close()
+        pool.putconn.assert_called_once_with(connection)
+        connection.close.assert_not_called()
+        self.assertIsNone(wrapper.connection)
+
+    def test_pool_is_closed_before_test_database_is_dropped(
+        self, ConnectionPool
+    ):
+        wrapper = DatabaseWrapper({**POOLED_DATABASE, "NAME": "test_airport"})
+        # no pool is opened just to be closed
+        wrapper.close_pool()
+        ConnectionPool.assert_not_called()
+
+        pool = wrapper.pool
+        calls = mock.Mock()
+        calls.attach_mock(pool.close, "close")
+        with mock.patch.object(
+            creation.DatabaseCreation, "_destroy_test_db"
+        ) as destroy_test_db:
+            calls.attach_mock(destroy_test_db, "destroy_test_db")
+            wrapper.creation._destroy_test_db("test_airport", 0)
+        self.assertEqual(
+            calls.mock_calls,
+            [mock.call.close(), mock.call.destroy_test_db("test_airport", 0)],
+        )
+        self.assertNotIn(
+            ("default", "test_airport"), DatabaseWrapper._connection_pools
+        )
+
+    def test_invalid_isolation_level_returns_connection(self, ConnectionPool):
+        pool = ConnectionPool.return_value
+        wrapper = DatabaseWrapper(
+            {
+                **POOLED_DATABASE,
+                "OPTIONS": {"pool": True, "isolation_level": 42},
+            }
+        )
+        with self.assertRaises(ImproperlyConfigured):
+            wrapper.get_new_connection({})
+        pool.putconn.assert_called_once_with(pool.getconn.return_value)
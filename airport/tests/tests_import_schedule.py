@@ -0,0 +1,110 @@
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from airport.models import Crew, Flight
+from airport.tests.tests_airport_api_authorized import (
+    create_auth_user,
+    sample_flight,
+)
+
+SCHEDULE_CSV = (
+    "route,airplane,departure_time,arrival_time,crew\n"
+    "{route},{airplane},2025-02-01T08:00Z,2025-02-01T10:00Z,{crew}\n"
+    "999,{airplane},2025-02-01T09:00Z,2025-02-01T11:00Z,\n"
+    "{route},{airplane},2025-02-01T12:00Z,2025-02-01T11:00Z,\n"
+    "{route},{airplane},2025-02-02T08:00Z,2025-02-02T10:00Z,\n"
+)
+
+
+class ImportScheduleTests(TestCase):
+    def setUp(self):
+        self.flight = sample_flight()
+        self.crew = Crew.objects.get()
+        self.schedule = SCHEDULE_CSV.format(
+            route=self.flight.route_id,
+            airplane=self.flight.airplane_id,
+            crew=self.crew.pk,
+        )
+        self.url = reverse("airport:flight-import-schedule")
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_superuser(
+                email="admin@example.com", password="<PASSWORD>"
+            )
+        )
+
+    def test_command_imports_valid_rows_and_reports_errors(self):
+        flights = Flight.objects.count()
+        with tempfile.NamedTemporaryFile(
+            "w", suffix=".csv", delete=False
+        ) as file:
+            file.write(self.schedule)
+        self.addCleanup(os.remove, file.name)
+        stdout, stderr = StringIO(), StringIO()
+        call_command(
+            "import_schedule",
+            file.name,
+            batch_size=2,
+            stdout=stdout,
+            stderr=stderr,
+        )
+        self.assertIn("Created 2 flights, rejected 2 rows", stdout.getvalue())
+        self.assertIn("row 2:", stderr.getvalue())
+        self.assertIn("row 3:", stderr.getvalue())
+        self.assertEqual(Flight.objects.count(), flights + 2)
+        imported = Flight.objects.get(departure_time__month=2, crew=self.crew)
+        self.assertEqual(
+            imported.seats_total,
+            self.flight.airplane.rows * self.flight.airplane.seats_in_row,
+        )
+
+    def test_import_endpoint_json(self):
+        rows = [
+            {
+                "route": self.flight.route_id,
+                "airplane": self.flight.airplane_id,
+                "departure_time": "2025-03-01T08:00Z",
+                "arrival_time": "2025-03-01T10:00Z",
+                "crew": [self.crew.pk, 999],
+            },
+            {
+                "route": self.flight.route_id,
+                "airplane": self.flight.airplane_id,
+                "departure_time": "2025-03-02T08:00Z",
+                "arrival_time": "2025-03-02T10:00Z",
+            },
+        ]
+        response = self.client.post(self.url, rows, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["created"], 1)
+        self.assertEqual(
+            response.data["errors"],
+            [{"row": 1, "errors": {"crew": ["Crew 999 does not exist."]}}],
+        )
+
+    def test_import_endpoint_csv_upload(self):
+        upload = SimpleUploadedFile(
+            "schedule.csv", self.schedule.encode(), content_type="text/csv"
+        )
+        response = self.client.post(
+            self.url, {"file": upload}, format="multipart"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["created"], 2)
+        self.assertEqual(
+            [error["row"] for error in response.data["errors"]], [2, 3]
+        )
+
+    def test_import_endpoint_staff_only(self):
+        self.client.force_authenticate(create_auth_user())
+        response = self.client.post(self.url, [], format="json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
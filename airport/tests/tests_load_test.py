@@ -0,0 +1,49 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import LiveServerTestCase
+
+
+class LoadTestTests(LiveServerTestCase):
+    def setUp(self):
+        get_user_model().objects.create_user(
+            email="load@example.com", password="<PASSWORD>"
+        )
+        self.results_file = tempfile.NamedTemporaryFile(
+            suffix=".json", delete=False
+        ).name
+
+    def tearDown(self):
+        os.remove(self.results_file)
+
+    def load_test(self, **options):
+        call_command(
+            "load_test",
+            self.live_server_url,
+            email="load@example.com",
+            concurrency=2,
+            duration=0.5,
+            stdout=StringIO(),
+            **options,
+        )
+
+    def test_load_test_reports_throughput(self):
+        self.load_test(
+            password="<PASSWORD>",
+            paths=["/api/airport/country/"],
+            save=self.results_file,
+        )
+        with open(self.results_file) as file:
+            results = json.load(file)
+        self.assertEqual(results["statuses"], {"200": results["requests"]})
+        self.assertGreater(results["requests_per_second"], 0)
+        self.assertGreaterEqual(results["p99_ms"], results["p50_ms"])
+
+    def test_load_test_needs_valid_credentials(self):
+        with self.assertRaisesMessage(CommandError, "401"):
+            self.load_test(password="wrong")
@@ -0,0 +1,95 @@
+from django.contrib.auth.models import AnonymousUser
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient, APIRequestFactory
+
+from airport.cache import get_cache, get_stats
+from airport.models import Country
+from airport.replica import (
+    ReplicaRouter,
+    check_pin_cache,
+    choose_replica,
+    is_pinned,
+    pin_to_primary,
+    reads_from,
+)
+from airport.tests.tests_airport_api_authorized import create_auth_user
+
+
+@override_settings(DATABASE_REPLICAS=["replica_0"])
+class ReplicaRoutingTests(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        self.user = create_auth_user()
+        self.factory = APIRequestFactory()
+
+    def request(self, method, user):
+        request = getattr(self.factory, method)("/")
+        request.user = user
+        return request
+
+    def test_router_reads_from_chosen_replica(self):
+        router = ReplicaRouter()
+        self.assertEqual(router.db_for_read(Country), "default")
+        with reads_from("replica_0"):
+            self.assertEqual(router.db_for_read(Country), "replica_0")
+            self.assertEqual(router.db_for_write(Country), "default")
+        self.assertFalse(router.allow_migrate("replica_0", "airport"))
+
+    def test_safe_requests_of_unpinned_users_use_replica(self):
+        self.assertEqual(
+            choose_replica(self.request("get", self.user)), "replica_0"
+        )
+        self.assertEqual(
+            choose_replica(self.request("get", AnonymousUser())), "replica_0"
+        )
+        self.assertIsNone(choose_replica(self.request("post", self.user)))
+
+        pin_to_primary(self.user)
+        self.assertIsNone(choose_replica(self.request("get", self.user)))
+
+    def test_write_pins_user_to_primary(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        client.get(reverse("airport:order-list"))
+        self.assertFalse(is_pinned(self.user))
+
+        response = client.post(reverse("airport:order-list"), {})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertTrue(is_pinned(self.user))
+
+    def test_pins_need_a_shared_cache(self):
+        with self.assertRaises(ImproperlyConfigured):
+            check_pin_cache()
+        with override_settings(
+            CACHES={
+                "catalog": {
+                    "BACKEND": "django.core.cache.backends.dummy."
+                    "DummyCache",
+                }
+            }
+        ):
+            check_pin_cache()
+        with override_settings(DATABASE_REPLICAS=[]):
+            check_pin_cache()
+
+
+class ReplicaCacheTests(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        Country.objects.create(name="Ukraine")
+        self.client = APIClient()
+        self.client.force_authenticate(create_auth_user())
+
+    def test_fresh_change_is_not_cached_from_replica(self):
+        # "default" stands in for a replica of itself
+        with override_settings(DATABASE_REPLICAS=["default"]):
+            self.client.get(reverse("airport:country-list"))
+            self.client.get(reverse("airport:country-list"))
+        self.assertEqual(get_stats()["hits"], 0)
+
+        self.client.get(reverse("airport:country-list"))
+        self.client.get(reverse("airport:country-list"))
+        self.assertEqual(get_stats()["hits"], 1)
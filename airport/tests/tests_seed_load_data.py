@@ -0,0 +1,54 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db.models import Count
+from django.test import TestCase
+
+from airport.models import Airport, Flight, Order, Route, Ticket
+from airport.seat_counters import drifted_flights
+
+
+class SeedLoadDataTests(TestCase):
+    def seed(self, **options):
+        defaults = {
+            "countries": 2,
+            "cities_per_country": 2,
+            "airports_per_city": 2,
+            "routes": 10,
+            "airplane_types": 2,
+            "airplanes": 3,
+            "crew": 5,
+            "flights": 7,
+            "users": 3,
+            "tickets": 100,
+            "batch_size": 20,
+            "stdout": StringIO(),
+        }
+        defaults.update(options)
+        call_command("seed_load_data", **defaults)
+
+    def test_seed_load_data(self):
+        self.seed()
+        self.assertEqual(Airport.objects.count(), 8)
+        self.assertEqual(Route.objects.count(), 10)
+        self.assertEqual(Flight.objects.count(), 7)
+        self.assertEqual(Ticket.objects.count(), 100)
+        self.assertFalse(
+            Order.objects.annotate(tickets_count=Count("tickets"))
+            .filter(tickets_count=0)
+            .exists()
+        )
+        self.assertFalse(drifted_flights(Flight.objects.all()).exists())
+        for route in Route.objects.select_related(
+            "source", "destination"
+        ).all():
+            self.assertIn(route.source.name, route.route_description)
+
+    def test_seed_load_data_is_reproducible(self):
+        self.seed(prefix="first")
+        first = list(Ticket.objects.order_by("pk").values_list("row", "seat"))
+        self.seed(prefix="second")
+        second = list(
+            Ticket.objects.order_by("pk").values_list("row", "seat")[100:]
+        )
+        self.assertEqual(first, second)
@@ -0,0 +1,90 @@
+import os
+import tempfile
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, override_settings
+from rest_framework.test import APIRequestFactory
+
+from airport.throttling import (
+    AnonSlidingWindowThrottle,
+    CacheCounterStore,
+    SQLiteCounterStore,
+    check_store,
+)
+
+
+class TwoPerMinuteThrottle(AnonSlidingWindowThrottle):
+    rate = "2/min"
+    now = 600.0
+
+    def timer(self):
+        return TwoPerMinuteThrottle.now
+
+
+class SlidingWindowThrottleTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "throttle.sqlite3")
+        store = override_settings(THROTTLE_SQLITE_PATH=self.path)
+        store.enable()
+        self.addCleanup(store.disable)
+        TwoPerMinuteThrottle.now = 600.0
+        self.request = APIRequestFactory().get("/")
+        self.request.user = AnonymousUser()
+
+    def allowed(self):
+        return TwoPerMinuteThrottle().allow_request(self.request, None)
+
+    def test_throttles_over_rate(self):
+        self.assertTrue(self.allowed())
+        self.assertTrue(self.allowed())
+        throttle = TwoPerMinuteThrottle()
+        self.assertFalse(throttle.allow_request(self.request, None))
+        self.assertEqual(throttle.wait(), 60)
+
+    def test_previous_window_weighs_by_overlap(self):
+        self.allowed()
+        self.allowed()
+        # a quarter into the next window 3/4 of the 2 requests still count
+        TwoPerMinuteThrottle.now = 675.0
+        throttle = TwoPerMinuteThrottle()
+        self.assertFalse(throttle.allow_request(self.request, None))
+        self.assertEqual(throttle.wait(), 15)
+
+        TwoPerMinuteThrottle.now = 690.0
+        self.assertTrue(self.allowed())
+        self.assertFalse(self.allowed())
+
+    def test_sqlite_store_is_shared(self):
+        # one store per worker process, all on the same file
+        first = SQLiteCounterStore(self.path)
+        second = SQLiteCounterStore(self.path)
+        self.assertEqual(first.hit("key", 10, 60), (0, 1))
+        self.assertEqual(second.hit("key", 10, 60), (0, 2))
+        second.release("key", 10)
+        self.assertEqual(first.hit("key", 11, 60), (1, 1))
+
+        # the default store of the throttles
+        self.assertTrue(self.allowed())
+        self.assertTrue(self.allowed())
+        self.assertFalse(self.allowed())
+
+    def test_cache_store(self):
+        cache.clear()
+        store = CacheCounterStore("default")
+        self.assertEqual(store.hit("key", 10, 60), (0, 1))
+        self.assertEqual(store.hit("key", 10, 60), (0, 2))
+        store.release("key", 10)
+        self.assertEqual(store.hit("key", 11, 60), (1, 1))
+
+    def test_local_memory_cache_store_is_refused(self):
+        check_store()
+        with override_settings(THROTTLE_STORE="cache"):
+            with self.assertRaises(ImproperlyConfigured):
+                check_store()
+        with override_settings(THROTTLE_STORE="redis"):
+            with self.assertRaises(ImproperlyConfigured):
+                check_store()
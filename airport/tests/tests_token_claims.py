@@ -0,0 +1,97 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from airport.tests.tests_airport_api_authorized import create_auth_user
+from user.authentication import ClaimsJWTAuthentication, ClaimsUser
+
+USER_TABLE = get_user_model()._meta.db_table
+
+
+class TokenClaimsTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_auth_user()
+        response = self.client.post(
+            reverse("user:token_obtain_pair"),
+            {"email": self.user.email, "password": "<PASSWORD>"},
+        )
+        self.tokens = response.data
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {self.tokens['access']}"
+        )
+
+    def test_token_carries_user_claims(self):
+        token = AccessToken(self.tokens["access"])
+        self.assertEqual(token["email"], self.user.email)
+        self.assertFalse(token["is_staff"])
+
+    def test_read_does_not_query_users(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("airport:flight-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(
+            [query for query in queries if USER_TABLE in query["sql"]]
+        )
+
+    def test_me_reads_user_from_database(self):
+        response = self.client.get(reverse("user:manage_user"))
+        self.assertEqual(response.data["email"], self.user.email)
+        self.assertEqual(response.data["first_name"], "Test")
+
+    def test_refresh_updates_claims(self):
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.post(
+            reverse("user:token_refresh"), {"refresh": self.tokens["refresh"]}
+        )
+        self.assertTrue(AccessToken(response.data["access"])["is_staff"])
+
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.post(
+            reverse("user:token_refresh"), {"refresh": self.tokens["refresh"]}
+        )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class ClaimsJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        self.user = create_auth_user()
+        token = AccessToken.for_user(self.user)
+        self.factory = APIRequestFactory(HTTP_AUTHORIZATION=f"Bearer {token}")
+        self.authentication = ClaimsJWTAuthentication()
+
+    def test_safe_method_gets_claims_user(self):
+        with self.assertNumQueries(0):
+            user, token = self.authentication.authenticate(
+                self.factory.get("/")
+            )
+        self.assertIsInstance(user, ClaimsUser)
+        self.assertEqual(user.pk, self.user.pk)
+
+    def test_write_caches_user_until_it_changes(self):
+        with self.assertNumQueries(1):
+            self.authentication.authenticate(self.factory.post("/"))
+        with self.assertNumQueries(0):
+            user, token = self.authentication.authenticate(
+                self.factory.post("/")
+            )
+        self.assertEqual(user, self.user)
+
+        self.user.save()
+        with self.assertNumQueries(1):
+            self.authentication.authenticate(self.factory.post("/"))
+
+    @override_settings(JWT_USER_CACHE_TTL=timedelta())
+    def test_write_without_cache_loads_user(self):
+        for _ in range(2):
+            with self.assertNumQueries(1):
+                self.authentication.authenticate(self.factory.post("/"))
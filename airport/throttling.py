@@ -0,0 +1,183 @@
+import functools
+import random
+import sqlite3
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.throttling import AnonRateThrottle, UserRateThrottle
+
+PURGE_PROBABILITY = 0.001
+
+
+class CacheCounterStore:
+    """
+    Window counters in a Django cache. They are shared by every process
+    using the same cache server; ``incr`` of the local memory cache is only
+    atomic within one process.
+    """
+
+    def __init__(self, alias: str):
+        self.alias = alias
+
+    def hit(self, key: str, window: int, duration: int) -> tuple:
+        """(previous, current) window counts after counting a request."""
+        cache = caches[self.alias]
+        current_key = f"{key}:{window}"
+        # the previous window is read for one more duration
+        cache.add(current_key, 0, timeout=2 * duration)
+        try:
+            current = cache.incr(current_key)
+        except ValueError:
+            # evicted between add() and incr()
+            cache.set(current_key, 1, timeout=2 * duration)
+            current = 1
+        return cache.get(f"{key}:{window - 1}", 0), current
+
+    def release(self, key: str, window: int) -> None:
+        try:
+            caches[self.alias].decr(f"{key}:{window}")
+        except ValueError:
+            pass
+
+
+class SQLiteCounterStore:
+    """
+    Window counters in a SQLite database in WAL mode, shared by all worker
+    processes of one host. Each count is a single atomic upsert.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.local = threading.local()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        # one connection per thread, opened after the worker was forked
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(
+                self.path, timeout=5, isolation_level=None
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS throttle_counter ("
+                " key TEXT NOT NULL,"
+                " window INTEGER NOT NULL,"
+                " count INTEGER NOT NULL,"
+                " expires REAL NOT NULL,"
+                " PRIMARY KEY (key, window)"
+                ") WITHOUT ROWID"
+            )
+            self.local.connection = connection
+        return connection
+
+    def hit(self, key: str, window: int, duration: int) -> tuple:
+        """(previous, current) window counts after counting a request."""
+        now = time.time()
+        connection = self.connection
+        if random.random() < PURGE_PROBABILITY:
+            connection.execute(
+                "DELETE FROM throttle_counter WHERE expires < ?", (now,)
+            )
+        (current,) = connection.execute(
+            "INSERT INTO throttle_counter VALUES (?, ?, 1, ?)"
+            " ON CONFLICT (key, window) DO UPDATE SET count = count + 1"
+            " RETURNING count",
+            (key, window, now + 2 * duration),
+        ).fetchone()
+        row = connection.execute(
+            "SELECT count FROM throttle_counter WHERE key = ? AND window = ?",
+            (key, window - 1),
+        ).fetchone()
+        return (row[0] if row else 0), current
+
+    def release(self, key: str, window: int) -> None:
+        self.connection.execute(
+            "UPDATE throttle_counter SET count = count - 1"
+            " WHERE key = ? AND window = ?",
+            (key, window),
+        )
+
+
+@functools.lru_cache
+def _open_store(kind: str, location: str):
+    if kind == "sqlite":
+        return SQLiteCounterStore(location)
+    return CacheCounterStore(location)
+
+
+def check_store() -> None:
+    """Refuse throttle stores that the worker processes would not share."""
+    if settings.THROTTLE_STORE == "sqlite":
+        return
+    if settings.THROTTLE_STORE != "cache":
+        raise ImproperlyConfigured(
+            f"Unknown THROTTLE_STORE {settings.THROTTLE_STORE!r}, "
+            "use 'sqlite' or 'cache'."
+        )
+    if isinstance(caches[settings.THROTTLE_CACHE_ALIAS], LocMemCache):
+        raise ImproperlyConfigured(
+            "THROTTLE_STORE 'cache' needs a cache shared by all workers, "
+            f"the {settings.THROTTLE_CACHE_ALIAS!r} cache is local memory."
+        )
+
+
+def get_store():
+    if settings.THROTTLE_STORE == "sqlite":
+        return _open_store("sqlite", settings.THROTTLE_SQLITE_PATH)
+    return _open_store("cache", settings.THROTTLE_CACHE_ALIAS)
+
+
+class SlidingWindowThrottleMixin:
+    """
+    Sliding window counter in place of the list of request timestamps of
+    ``SimpleRateThrottle``: only the counts of the current and previous
+    fixed windows are stored, and the previous one is weighted by how much
+    of it the sliding window still covers. Requests over the rate are not
+    counted.
+    """
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        window, offset = divmod(self.now, self.duration)
+        self.window = int(window)
+        self.weight = 1 - offset / self.duration
+        store = get_store()
+        self.previous, self.current = store.hit(
+            self.key, self.window, self.duration
+        )
+        if self.previous * self.weight + self.current > self.num_requests:
+            store.release(self.key, self.window)
+            self.current -= 1
+            return self.throttle_failure()
+        return True
+
+    def wait(self):
+        """Seconds until the sliding window has room for a request."""
+        window_end = (self.window + 1) * self.duration
+        room = self.num_requests - self.current - 1
+        if room < 0 or not self.previous:
+            return window_end - self.now
+        # the previous window's weight has to fall to room / previous
+        return max(
+            window_end - self.now - room / self.previous * self.duration, 0
+        )
+
+
+class AnonSlidingWindowThrottle(SlidingWindowThrottleMixin, AnonRateThrottle):
+    pass
+
+
+class UserSlidingWindowThrottle(SlidingWindowThrottleMixin, UserRateThrottle):
+    pass
@@ -1,7 +1,8 @@
-from django.urls import path, include
+from django.urls import path, re_path, include
 
 from rest_framework.routers import DefaultRouter
 
+from airport import async_views
 from airport.views import (
     AirplaneTypeViewSet,
     AirportViewSet,
@@ -12,6 +13,12 @@ from airport.views import (
     CrewViewSet,
     FlightViewSet,
     OrderViewSet,
+    ItineraryView,
+    CacheStatsView,
+    HealthView,
+    PoolStatsView,
+    ExportView,
+    FlightManifestExportView,
     # TicketViewSet
 )
 
@@ -31,5 +38,26 @@ router.register("order", OrderViewSet)
 
 
 urlpatterns = [
+    path("itinerary/", ItineraryView.as_view(), name="itinerary"),
+    path("async/flight/", async_views.flight_list, name="async-flight-list"),
+    path(
+        "async/flight/<int:pk>/",
+        async_views.flight_detail,
+        name="async-flight-detail",
+    ),
+    path("async/route/", async_views.route_list, name="async-route-list"),
+    path("cache-stats/", CacheStatsView.as_view(), name="cache-stats"),
+    path("health/", HealthView.as_view(), name="health"),
+    path("pool-stats/", PoolStatsView.as_view(), name="pool-stats"),
+    re_path(
+        r"^export/(?P<resource>tickets|orders)\.(?P<file_format>csv|ndjson)$",
+        ExportView.as_view(),
+        name="export",
+    ),
+    re_path(
+        r"^export/flights/(?P<pk>\d+)/manifest\.(?P<file_format>csv|ndjson)$",
+        FlightManifestExportView.as_view(),
+        name="flight-manifest-export",
+    ),
     path("", include(router.urls)),
 ]
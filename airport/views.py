@@ -1,9 +1,21 @@
-from django.db.models import Count, F, Value
-from django.db.models.functions import Concat
+from datetime import datetime, time, timedelta
+from io import TextIOWrapper
 
-from rest_framework import viewsets, mixins
-from rest_framework.permissions import IsAuthenticated
-from rest_framework.exceptions import ValidationError
+from django.db.models import F, Value, Prefetch
+from django.db.models.functions import Concat
+from django.utils import timezone
+
+from rest_framework import generics, viewsets, mixins, status
+from rest_framework.decorators import action
+from rest_framework.parsers import JSONParser, MultiPartParser
+from rest_framework.response import Response
+from rest_framework.permissions import (
+    AllowAny,
+    IsAdminUser,
+    IsAuthenticated,
+)
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.views import APIView
 
 from drf_spectacular.utils import (
     extend_schema,
@@ -23,6 +35,7 @@ from airport.models import (
     Flight,
     Ticket,
     Order,
+    SeatHold,
 )
 
 from airport.serializers import (
@@ -44,21 +57,46 @@ from airport.serializers import (
     CountryListSerializer,
     FlightListSerializer,
     FlightDetailSerializer,
+    SeatMapSerializer,
+    FlightSeatHoldSerializer,
+    ItinerarySearchSerializer,
+    ItinerarySerializer,
+    FlightDateFilterSerializer,
+    CacheStatsSerializer,
+    HealthSerializer,
+    PoolStatsSerializer,
+    ScheduleRowSerializer,
+    ScheduleImportResultSerializer,
 )
-
-
-class AirplaneTypeViewSet(viewsets.ModelViewSet):
+from airport.bulk import BulkUpsertMixin
+from airport.cache import CachedResponseMixin, get_stats
+from airport.conditional import ConditionalGetMixin
+from airport.health import check_database, get_pool_stats
+from airport import exports
+from airport.pagination import KeysetPagination
+from airport.replica import ReplicaReadMixin
+from airport.route_graph import route_graph
+from airport.schedule_import import import_schedule, read_rows
+
+
+class AirplaneTypeViewSet(
+    ReplicaReadMixin, CachedResponseMixin, viewsets.ModelViewSet
+):
     """Endpoint for airplane types"""
 
     queryset = AirplaneType.objects.all()
     serializer_class = AirplaneTypeSerializer
+    cache_models = (AirplaneType,)
 
 
-class AirplaneViewSet(viewsets.ModelViewSet):
+class AirplaneViewSet(
+    ReplicaReadMixin, CachedResponseMixin, viewsets.ModelViewSet
+):
     """Endpoint for airplanes"""
 
     queryset = Airplane.objects.select_related("airplane_type")
     serializer_class = AirplaneSerializer
+    cache_models = (Airplane, AirplaneType)
 
     def get_serializer_class(self):
         if self.action in ("list", "retrieve"):
@@ -66,11 +104,17 @@ class AirplaneViewSet(viewsets.ModelViewSet):
         return self.serializer_class
 
 
-class CountryViewSet(viewsets.ModelViewSet):
+class CountryViewSet(
+    ReplicaReadMixin,
+    BulkUpsertMixin,
+    CachedResponseMixin,
+    viewsets.ModelViewSet,
+):
     """Endpoint for countries"""
 
     queryset = Country.objects.all()
     serializer_class = CountrySerializer
+    cache_models = (Country, City)
 
     def get_serializer_class(self):
         if self.action in ("list", "retrieve"):
@@ -78,11 +122,17 @@ class CountryViewSet(viewsets.ModelViewSet):
         return self.serializer_class
 
 
-class CityViewSet(viewsets.ModelViewSet):
+class CityViewSet(
+    ReplicaReadMixin,
+    BulkUpsertMixin,
+    CachedResponseMixin,
+    viewsets.ModelViewSet,
+):
     """Endpoint for cities"""
 
     queryset = City.objects.all()
     serializer_class = CitySerializer
+    cache_models = (City, Country)
 
     def get_serializer_class(self):
         if self.action in ("list", "retrieve"):
@@ -90,13 +140,20 @@ class CityViewSet(viewsets.ModelViewSet):
         return self.serializer_class
 
 
-class AirportViewSet(viewsets.ModelViewSet):
+class AirportViewSet(
+    ReplicaReadMixin,
+    BulkUpsertMixin,
+    ConditionalGetMixin,
+    CachedResponseMixin,
+    viewsets.ModelViewSet,
+):
     """Endpoint for airports"""
 
     queryset = Airport.objects.all().select_related(
         "closest_big_city__country"
     )
     serializer_class = AirportSerializer
+    cache_models = (Airport, City, Country)
 
     def get_serializer_class(self):
         if self.action in ("list", "retrieve"):
@@ -131,7 +188,13 @@ class AirportViewSet(viewsets.ModelViewSet):
         return super().list(request, *self.args, **self.kwargs)
 
 
-class RouteViewSet(viewsets.ModelViewSet):
+class RouteViewSet(
+    ReplicaReadMixin,
+    BulkUpsertMixin,
+    ConditionalGetMixin,
+    CachedResponseMixin,
+    viewsets.ModelViewSet,
+):
     """Endpoint for routes"""
 
     queryset = Route.objects.all().prefetch_related(
@@ -139,6 +202,9 @@ class RouteViewSet(viewsets.ModelViewSet):
         "destination__closest_big_city__country",
     )
     serializer_class = RouteSerializer
+    cache_models = (Route, Airport, City, Country)
+    pagination_class = KeysetPagination
+    keyset_ordering = ("id",)
 
     def get_serializer_class(self):
         if self.action in ("list", "retrieve"):
@@ -209,24 +275,21 @@ class RouteViewSet(viewsets.ModelViewSet):
         return super().list(request, *self.args, **self.kwargs)
 
 
-class CrewViewSet(viewsets.ModelViewSet):
+class CrewViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     """Endpoint for crews"""
 
     queryset = Crew.objects.all()
     serializer_class = CrewSerializer
 
 
-class FlightViewSet(viewsets.ModelViewSet):
+class FlightViewSet(
+    ReplicaReadMixin, ConditionalGetMixin, viewsets.ModelViewSet
+):
     """Endpoint for flights"""
 
-    queryset = (
-        Flight.objects.select_related("airplane", "route")
-        .prefetch_related(
-            "crew",
-            "taken_tickets",
-        )
-        .annotate(num_taken_tickets=Count("taken_tickets"))
-    )
+    queryset = Flight.objects.select_related("airplane")
+    pagination_class = KeysetPagination
+    keyset_ordering = ("departure_time", "id")
 
     serializer_class = FlightSerializer
 
@@ -235,14 +298,44 @@ class FlightViewSet(viewsets.ModelViewSet):
             return FlightListSerializer
         elif self.action == "retrieve":
             return FlightDetailSerializer
+        elif self.action == "seat_map":
+            return SeatMapSerializer
+        elif self.action == "hold":
+            return FlightSeatHoldSerializer
+        elif self.action == "import_schedule":
+            return ScheduleRowSerializer
         return self.serializer_class
 
     @staticmethod
     def split_params(params):
         return params.split("-")
 
+    def get_action_queryset(self):
+        """Load only what the serializer of the current action reads."""
+        taken_tickets = Prefetch(
+            "taken_tickets",
+            queryset=Ticket.objects.only("row", "seat", "flight"),
+        )
+        if self.action == "list":
+            return Flight.objects.select_related("airplane", "route").only(
+                "departure_time",
+                "arrival_time",
+                "seats_total",
+                "seats_taken",
+                "updated_at",
+                "airplane__name",
+                "route__route_description",
+            )
+        elif self.action == "retrieve":
+            return Flight.objects.select_related(
+                "airplane", "route"
+            ).prefetch_related("crew", taken_tickets)
+        elif self.action == "seat_map":
+            return self.queryset.prefetch_related(taken_tickets)
+        return self.queryset
+
     def get_queryset(self):
-        queryset = self.queryset
+        queryset = self.get_action_queryset()
         for param in self.request.query_params:
             if param not in ["countries", "cities", "airports"]:
                 continue
@@ -281,6 +374,29 @@ class FlightViewSet(viewsets.ModelViewSet):
             except Exception as e:
                 raise ValidationError({param: str(e)})
 
+        return self.filter_departure_time(queryset)
+
+    def filter_departure_time(self, queryset):
+        """Range filters served by the (route, departure_time) index."""
+        dates = FlightDateFilterSerializer(data=self.request.query_params)
+        dates.is_valid(raise_exception=True)
+        params = dates.validated_data
+        if "date" in params:
+            start = timezone.make_aware(
+                datetime.combine(params["date"], time.min)
+            )
+            queryset = queryset.filter(
+                departure_time__gte=start,
+                departure_time__lt=start + timedelta(days=1),
+            )
+        if "departure_after" in params:
+            queryset = queryset.filter(
+                departure_time__gte=params["departure_after"]
+            )
+        if "departure_before" in params:
+            queryset = queryset.filter(
+                departure_time__lt=params["departure_before"]
+            )
         return queryset
 
     @extend_schema(
@@ -293,13 +409,123 @@ class FlightViewSet(viewsets.ModelViewSet):
                 "example_1/?cities=paris-london "
                 "example_2/?countries=france-ukraine"
                 "example_3/?airports=1-5)",
-            )
+            ),
+            FlightDateFilterSerializer,
         ]
     )
     def list(self, request):
         """Get list of flights."""
         return super().list(request, *self.args, **self.kwargs)
 
+    @action(detail=True, methods=["get"], url_path="seat-map")
+    def seat_map(self, request, pk=None):
+        """Get packed seat occupancy of the flight."""
+
+        def seat_map_response(request, pk=None):
+            flight = self.get_object()
+            serializer = self.get_serializer(flight.seat_map)
+            return Response(serializer.data)
+
+        return self.conditional_response(seat_map_response, request, pk=pk)
+
+    @action(
+        detail=True,
+        methods=["post", "delete"],
+        permission_classes=(IsAuthenticated,),
+    )
+    def hold(self, request, pk=None):
+        """Hold seats for a short time before ordering, or release them."""
+        flight = self.get_object()
+        if request.method == "DELETE":
+            SeatHold.objects.filter(flight=flight, user=request.user).delete()
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        context = self.get_serializer_context()
+        context["flight"] = flight
+        serializer = self.get_serializer(data=request.data, context=context)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @extend_schema(
+        request=ScheduleRowSerializer(many=True),
+        responses=ScheduleImportResultSerializer,
+    )
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="import",
+        permission_classes=(IsAdminUser,),
+        parser_classes=(JSONParser, MultiPartParser),
+    )
+    def import_schedule(self, request):
+        """Create many flights with crew from a JSON array of flights or an
+        uploaded CSV/JSON ``file``; rows with errors are reported and
+        skipped, the rest are created."""
+        if isinstance(request.data, list):
+            result = import_schedule(request.data)
+        elif "file" in request.FILES:
+            upload = request.FILES["file"]
+            file_format = (
+                "json" if upload.name.lower().endswith(".json") else "csv"
+            )
+            try:
+                result = import_schedule(
+                    read_rows(
+                        TextIOWrapper(upload, encoding="utf-8-sig"),
+                        file_format,
+                    )
+                )
+            except ValueError as error:
+                raise ValidationError({"file": str(error)})
+        else:
+            raise ValidationError(
+                {"file": "Send a JSON array of flights or a schedule file."}
+            )
+        return Response(ScheduleImportResultSerializer(result).data)
+
+
+class ItineraryView(ReplicaReadMixin, generics.GenericAPIView):
+    """Endpoint for direct and connecting flights between two airports"""
+
+    serializer_class = ItinerarySerializer
+    pagination_class = None
+
+    @extend_schema(
+        parameters=[ItinerarySearchSerializer],
+        responses=ItinerarySerializer(many=True),
+    )
+    def get(self, request):
+        """Get itineraries with up to two connections, earliest arrival
+        first (example/?source=1&destination=5&date=2025-01-15)."""
+        search = ItinerarySearchSerializer(data=request.query_params)
+        search.is_valid(raise_exception=True)
+        params = search.validated_data
+        day = params.get("date") or timezone.localdate()
+        start = timezone.make_aware(datetime.combine(day, time.min))
+        itineraries = route_graph.search(
+            source_id=params["source"],
+            destination_id=params["destination"],
+            departure_from=max(start, timezone.now()),
+            departure_to=start + timedelta(days=1),
+            min_connection=timedelta(minutes=params["min_connection_minutes"]),
+            max_connections=params["max_connections"],
+            limit=params["limit"],
+        )
+        flights = Flight.objects.select_related("airplane", "route").in_bulk(
+            {leg.flight_id for legs in itineraries for leg in legs}
+        )
+        data = [
+            {
+                "departure_time": legs[0].departure_time,
+                "arrival_time": legs[-1].arrival_time,
+                "connections": len(legs) - 1,
+                "flights": [flights[leg.flight_id] for leg in legs],
+            }
+            for legs in itineraries
+            if all(leg.flight_id in flights for leg in legs)
+        ]
+        return Response(self.get_serializer(data, many=True).data)
+
 
 class OrderViewSet(
     mixins.CreateModelMixin,
@@ -309,18 +535,32 @@ class OrderViewSet(
 ):
     """Endpoint for orders"""
 
-    queryset = Order.objects.all().prefetch_related(
-        "tickets__flight__route__source",
-        "tickets__flight__route__destination",
-        "tickets__flight__airplane",
-    )
+    queryset = Order.objects.all()
     serializer_class = OrderCreateSerializer
     permission_classes = (IsAuthenticated,)
+    pagination_class = KeysetPagination
+    keyset_ordering = ("created", "id")
 
     def get_queryset(self):
-        queryset = self.queryset.filter(user=self.request.user)
+        queryset = self.queryset.filter(user_id=self.request.user.pk)
         return queryset
 
+    def list(self, request, *args, **kwargs):
+        """Get list of own orders, tickets of a page read in one query."""
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        orders = list(queryset) if page is None else page
+        OrderListSerializer.load_tickets(orders)
+        serializer = self.get_serializer(orders, many=True)
+        if page is None:
+            return Response(serializer.data)
+        return self.get_paginated_response(serializer.data)
+
+    def retrieve(self, request, *args, **kwargs):
+        order = self.get_object()
+        OrderListSerializer.load_tickets([order])
+        return Response(self.get_serializer(order).data)
+
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
@@ -329,3 +569,87 @@ class OrderViewSet(
             return OrderListSerializer
         elif self.action == "create":
             return OrderCreateSerializer
+
+
+class CacheStatsView(generics.GenericAPIView):
+    """Endpoint for hit and invalidation counters of the catalog cache"""
+
+    serializer_class = CacheStatsSerializer
+    permission_classes = (IsAdminUser,)
+    pagination_class = None
+
+    def get(self, request):
+        """Get catalog cache hits, misses, hit rate and invalidations."""
+        return Response(self.get_serializer(get_stats()).data)
+
+
+class HealthView(generics.GenericAPIView):
+    """Endpoint for load balancer health checks"""
+
+    serializer_class = HealthSerializer
+    authentication_classes = ()
+    permission_classes = (AllowAny,)
+    throttle_classes = ()
+    pagination_class = None
+
+    @extend_schema(responses={200: HealthSerializer, 503: HealthSerializer})
+    def get(self, request):
+        """Check that the database answers."""
+        if check_database():
+            return Response(self.get_serializer({"status": "ok"}).data)
+        return Response(
+            self.get_serializer({"status": "unavailable"}).data,
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+
+
+class PoolStatsView(generics.GenericAPIView):
+    """Endpoint for counters of the database connection pool"""
+
+    serializer_class = PoolStatsSerializer
+    permission_classes = (IsAdminUser,)
+    pagination_class = None
+
+    def get(self, request):
+        """Get the pool metrics of the worker that answers."""
+        stats = get_pool_stats()
+        if stats is None:
+            raise NotFound("The database is not pooled.")
+        return Response(self.get_serializer(stats).data)
+
+
+EXPORT_RESPONSES = {
+    (200, content_type): OpenApiTypes.STR
+    for content_type, writer in exports.FORMATS.values()
+}
+
+
+class ExportView(APIView):
+    """Endpoint for staff-only streaming exports of tickets and orders"""
+
+    permission_classes = (IsAdminUser,)
+    sources = {"tickets": exports.tickets, "orders": exports.orders}
+
+    @extend_schema(responses=EXPORT_RESPONSES)
+    def get(self, request, resource, file_format):
+        """Stream every ticket or order as CSV or newline-delimited JSON."""
+        queryset, columns = self.sources[resource]()
+        return exports.stream_export(
+            request, queryset, columns, file_format, resource
+        )
+
+
+class FlightManifestExportView(APIView):
+    """Endpoint for staff-only streaming passenger manifests of flights"""
+
+    permission_classes = (IsAdminUser,)
+
+    @extend_schema(responses=EXPORT_RESPONSES)
+    def get(self, request, pk, file_format):
+        """Stream seats and passengers of the flight, ordered by seat."""
+        if not Flight.objects.filter(pk=pk).exists():
+            raise NotFound()
+        queryset, columns = exports.flight_manifest(pk)
+        return exports.stream_export(
+            request, queryset, columns, file_format, f"flight-{pk}-manifest"
+        )
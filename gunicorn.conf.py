@@ -0,0 +1,41 @@
+"""
+Gunicorn settings of the production run mode:
+
+    gunicorn -c gunicorn.conf.py
+
+Worker counts are derived from the CPU count; every value can be
+overridden with the GUNICORN_* environment variables.
+"""
+
+import multiprocessing
+import os
+
+cpu_count = multiprocessing.cpu_count()
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+
+# "gthread" serves the WSGI application from a thread pool per worker,
+# "uvicorn_worker.UvicornWorker" the ASGI application with the async views
+# running on the event loop
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+wsgi_app = (
+    "service_config.asgi:application"
+    if "uvicorn" in worker_class.lower()
+    else "service_config.wsgi:application"
+)
+
+workers = int(os.environ.get("GUNICORN_WORKERS", cpu_count * 2 + 1))
+# a worker holds up to DB_POOL_MAX_SIZE database connections (one per
+# thread without DB_POOL), so workers times that must stay below the
+# PostgreSQL max_connections
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", 5))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", 30))
+
+# recycle workers now and then to bound memory growth
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 1000))
+max_requests_jitter = max_requests // 10
+
+accesslog = "-"
+errorlog = "-"
@@ -0,0 +1,97 @@
+"""
+PostgreSQL backend that takes its connections from a psycopg_pool
+``ConnectionPool`` per process, configured like the ``pool`` option of
+Django 5.1's backend::
+
+    "ENGINE": "service_config.postgresql_pool",
+    "CONN_MAX_AGE": 0,
+    "OPTIONS": {"pool": {"min_size": 2, "max_size": 10, "timeout": 30}},
+
+Closing the connection at the end of a request returns it to the pool. The
+test database closes its pool before it is dropped.
+"""
+
+import threading
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.base.base import NO_DB_ALIAS
+from django.db.backends.postgresql import base
+from django.utils.asyncio import async_unsafe
+from psycopg import IsolationLevel
+from psycopg_pool import ConnectionPool
+
+from service_config.postgresql_pool.creation import DatabaseCreation
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+    _connection_pools = {}
+    _connection_pools_lock = threading.Lock()
+
+    @property
+    def pool(self):
+        """Pool of this database, ``None`` when pooling is off."""
+        pool_options = self.settings_dict["OPTIONS"].get("pool")
+        if self.alias == NO_DB_ALIAS or not pool_options:
+            return None
+        if self.settings_dict["CONN_MAX_AGE"] != 0:
+            raise ImproperlyConfigured(
+                "Pooled connections can't be persistent, set CONN_MAX_AGE "
+                "to 0."
+            )
+        # the test runner renames the database after it was first used
+        key = (self.alias, self.settings_dict["NAME"])
+        with self._connection_pools_lock:
+            if key not in self._connection_pools:
+                pool = ConnectionPool(
+                    kwargs=self.get_connection_params(),
+                    open=False,
+                    check=ConnectionPool.check_connection,
+                    name=self.alias,
+                    **({} if pool_options is True else pool_options),
+                )
+                pool.open()
+                self._connection_pools[key] = pool
+            return self._connection_pools[key]
+
+    def close_pool(self):
+        """Close this process' pool of the database, if it was opened."""
+        key = (self.alias, self.settings_dict["NAME"])
+        with self._connection_pools_lock:
+            pool = self._connection_pools.pop(key, None)
+        if pool is not None:
+            pool.close()
+
+    def get_connection_params(self):
+        conn_params = super().get_connection_params()
+        conn_params.pop("pool", None)
+        return conn_params
+
+    @async_unsafe
+    def get_new_connection(self, conn_params):
+        pool = self.pool
+        if pool is None:
+            return super().get_new_connection(conn_params)
+        connection = pool.getconn()
+        isolation_level = self.settings_dict["OPTIONS"].get("isolation_level")
+        try:
+            self.isolation_level = IsolationLevel(
+                isolation_level or IsolationLevel.READ_COMMITTED
+            )
+        except ValueError:
+            pool.putconn(connection)
+            raise ImproperlyConfigured(
+                f"Invalid transaction isolation level {isolation_level} "
+                f"specified. Use one of the psycopg.IsolationLevel values."
+            )
+        if isolation_level is not None:
+            connection.isolation_level = self.isolation_level
+        return connection
+
+    def _close(self):
+        if self.connection is None or self.pool is None:
+            return super()._close()
+        with self.wrap_database_errors:
+            self.pool.putconn(self.connection)
+        # the connection may already be handed out again
+        self.connection = None
@@ -0,0 +1,8 @@
+from django.db.backends.postgresql import creation
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+    def _destroy_test_db(self, test_database_name, verbosity):
+        # DROP DATABASE fails while the pool holds connections to it
+        self.connection.close_pool()
+        super()._destroy_test_db(test_database_name, verbosity)
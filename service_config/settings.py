@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
 import os
+import tempfile
 from pathlib import Path
 
 from datetime import timedelta
@@ -29,7 +30,7 @@ load_dotenv()
 SECRET_KEY = os.environ.get("SECRET_KEY")
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = os.environ.get("DEBUG")
+DEBUG = os.environ.get("DEBUG", "").lower() in ("1", "true", "yes")
 
 ALLOWED_HOSTS = os.environ.get("ALLOWED_HOSTS").split(",")
 
@@ -47,21 +48,28 @@ INSTALLED_APPS = [
     "rest_framework_simplejwt",
     "airport",
     "user",
-    "debug_toolbar",
     "drf_spectacular",
 ]
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
-    "debug_toolbar.middleware.DebugToolbarMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "airport.replica.ReplicaPinMiddleware",
 ]
 
+# the toolbar instruments every request, so it is only loaded for debugging
+if DEBUG:
+    INSTALLED_APPS.append("debug_toolbar")
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index("django.middleware.common.CommonMiddleware"),
+        "debug_toolbar.middleware.DebugToolbarMiddleware",
+    )
+
 ROOT_URLCONF = "service_config.urls"
 
 TEMPLATES = [
@@ -86,17 +94,69 @@ WSGI_APPLICATION = "service_config.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# with DB_POOL every worker process takes its connections from a psycopg
+# pool and returns them after each request, so they are not kept open
+# through CONN_MAX_AGE
+DB_POOL = os.environ.get("DB_POOL", "true").lower() in ("1", "true", "yes")
+
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.postgresql",
+        "ENGINE": (
+            "service_config.postgresql_pool"
+            if DB_POOL
+            else "django.db.backends.postgresql"
+        ),
         "NAME": os.environ["POSTGRES_DB"],
         "USER": os.environ["POSTGRES_USER"],
         "PASSWORD": os.environ["POSTGRES_PASSWORD"],
         "HOST": os.environ["POSTGRES_HOST"],
         "PORT": os.environ["POSTGRES_PORT"],
+        # keep connections open between requests of a worker thread, and
+        # check them before reuse after a database restart
+        "CONN_MAX_AGE": (
+            0 if DB_POOL else int(os.environ.get("CONN_MAX_AGE", 60))
+        ),
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": (
+            {
+                "pool": {
+                    "min_size": int(os.environ.get("DB_POOL_MIN_SIZE", 2)),
+                    "max_size": int(os.environ.get("DB_POOL_MAX_SIZE", 10)),
+                    # seconds a request waits for a free connection
+                    "timeout": float(os.environ.get("DB_POOL_TIMEOUT", 30)),
+                }
+            }
+            if DB_POOL
+            else {}
+        ),
     }
 }
 
+# streaming replicas of "default" as "host[:port],..."; safe-method reads
+# of the catalog and flight search views are spread over them
+DATABASE_REPLICAS = []
+for index, address in enumerate(
+    filter(None, os.environ.get("POSTGRES_REPLICA_HOSTS", "").split(","))
+):
+    host, _, port = address.strip().partition(":")
+    DATABASES[f"replica_{index}"] = {
+        **DATABASES["default"],
+        "HOST": host,
+        "PORT": port or DATABASES["default"]["PORT"],
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(f"replica_{index}")
+
+DATABASE_ROUTERS = ["airport.replica.ReplicaRouter"]
+
+# after a write, the user's reads stay on the primary this long, which
+# should exceed the replication lag; the pins are kept in the
+# REPLICA_PIN_CACHE_ALIAS cache, so with replicas that cache has to be
+# shared by the workers (a local memory cache is refused at startup)
+REPLICA_STICKINESS = timedelta(
+    seconds=int(os.environ.get("REPLICA_STICKINESS_SECONDS", 5))
+)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -143,7 +203,7 @@ AUTH_USER_MODEL = "user.User"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "user.authentication.ClaimsJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": (
         "airport.permissions.IsAdminAllOrAuthenticatedReadOnly",
@@ -152,17 +212,80 @@ REST_FRAMEWORK = {
     "PAGE_SIZE": 10,
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle",
+        "airport.throttling.AnonSlidingWindowThrottle",
+        "airport.throttling.UserSlidingWindowThrottle",
     ],
-    "DEFAULT_THROTTLE_RATES": {"anon": "100/day", "user": "1000/day"},
+    "DEFAULT_THROTTLE_RATES": {
+        "anon": os.environ.get("THROTTLE_RATE_ANON", "100/day"),
+        "user": os.environ.get("THROTTLE_RATE_USER", "1000/day"),
+    },
 }
 
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=3),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
+    "TOKEN_USER_CLASS": "user.authentication.ClaimsUser",
+    "TOKEN_OBTAIN_SERIALIZER": (
+        "user.serializers.ClaimsTokenObtainPairSerializer"
+    ),
+    "TOKEN_REFRESH_SERIALIZER": (
+        "user.serializers.ClaimsTokenRefreshSerializer"
+    ),
+}
+
+# writes load the user at most once per this period and worker (0: always)
+JWT_USER_CACHE_TTL = timedelta(
+    seconds=int(os.environ.get("JWT_USER_CACHE_TTL_SECONDS", 30))
+)
+
+SEAT_HOLD_TTL = timedelta(
+    minutes=int(os.environ.get("SEAT_HOLD_TTL_MINUTES", 10))
+)
+
+ROUTE_GRAPH_TTL = timedelta(
+    seconds=int(os.environ.get("ROUTE_GRAPH_TTL_SECONDS", 300))
+)
+
+ITINERARY_MIN_CONNECTION = timedelta(
+    minutes=int(os.environ.get("ITINERARY_MIN_CONNECTION_MINUTES", 45))
+)
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    # list/retrieve responses of the catalog viewsets; point it at a
+    # FileBasedCache directory (or a shared cache server) to share the
+    # entries and their invalidation between several worker processes
+    "catalog": {
+        "BACKEND": os.environ.get(
+            "CATALOG_CACHE_BACKEND",
+            "django.core.cache.backends.locmem.LocMemCache",
+        ),
+        "LOCATION": os.environ.get("CATALOG_CACHE_LOCATION", "catalog"),
+        "TIMEOUT": int(os.environ.get("CATALOG_CACHE_TTL_SECONDS", 300)),
+        "OPTIONS": {"MAX_ENTRIES": 10_000},
+    },
 }
 
+CATALOG_CACHE_ALIAS = "catalog"
+
+REPLICA_PIN_CACHE_ALIAS = "catalog"
+
+# sliding window throttle counters: "sqlite" keeps them in a WAL-mode
+# database file shared by all workers of the host, "cache" in the
+# THROTTLE_CACHE_ALIAS cache, which has to be shared by the workers as well
+# (a local memory cache is refused at startup)
+THROTTLE_STORE = os.environ.get("THROTTLE_STORE", "sqlite")
+THROTTLE_CACHE_ALIAS = "default"
+THROTTLE_SQLITE_PATH = os.environ.get(
+    "THROTTLE_SQLITE_PATH",
+    os.path.join(tempfile.gettempdir(), "airport-throttle.sqlite3"),
+)
+
+# counts the throttled requests of a test run in a throwaway file
+TEST_RUNNER = "service_config.test_runner.TestRunner"
+
 INTERNAL_IPS = [
     "127.0.0.1",
 ]
@@ -0,0 +1,23 @@
+import os
+import tempfile
+
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+
+
+class TestRunner(DiscoverRunner):
+    """
+    Runs the tests with their own throttle counters, so the requests of
+    earlier runs do not count against the rate limits.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.throttle_directory = tempfile.TemporaryDirectory()
+        settings.THROTTLE_SQLITE_PATH = os.path.join(
+            self.throttle_directory.name, "throttle.sqlite3"
+        )
+
+    def teardown_test_environment(self, **kwargs):
+        super().teardown_test_environment(**kwargs)
+        self.throttle_directory.cleanup()
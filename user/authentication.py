@@ -0,0 +1,76 @@
+import copy
+import time
+
+from django.conf import settings
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+MAX_CACHED_USERS = 10_000
+
+_users = {}
+
+
+def set_user_claims(token, user) -> None:
+    """Copy what read-only requests need to know of ``user`` to ``token``."""
+    token["email"] = user.email
+    token["is_staff"] = user.is_staff
+    token["is_superuser"] = user.is_superuser
+
+
+def forget_user(user_id) -> None:
+    _users.pop(user_id, None)
+
+
+class ClaimsUser(TokenUser):
+    """User of a validated access token, read from its claims only."""
+
+    @cached_property
+    def email(self) -> str:
+        return self.token.get("email", "")
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that trusts the token's claims on safe methods:
+    GET, HEAD and OPTIONS requests get a :class:`ClaimsUser` without
+    querying the user table. Other methods load the ``User``, which is
+    then kept in process memory for ``JWT_USER_CACHE_TTL``.
+    """
+
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        if request.method in SAFE_METHODS:
+            return self.get_token_user(validated_token), validated_token
+        return self.get_user(validated_token), validated_token
+
+    def get_token_user(self, validated_token):
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            )
+        return api_settings.TOKEN_USER_CLASS(validated_token)
+
+    def get_user(self, validated_token):
+        ttl = settings.JWT_USER_CACHE_TTL.total_seconds()
+        if not ttl:
+            return super().get_user(validated_token)
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        expires_at, user = _users.get(user_id, (0, None))
+        if expires_at < time.monotonic():
+            user = super().get_user(validated_token)
+            if len(_users) >= MAX_CACHED_USERS:
+                _users.clear()
+            _users[user_id] = (time.monotonic() + ttl, user)
+        # views may change the user they are given
+        return copy.copy(user)
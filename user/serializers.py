@@ -1,6 +1,15 @@
 from django.contrib.auth import get_user_model
 
 from rest_framework import serializers
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from user.authentication import set_user_claims
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -30,3 +39,47 @@ class UserSerializer(serializers.ModelSerializer):
             user.set_password(password)
             user.save()
         return user
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Token pair carrying the user's email and staff status as claims."""
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        set_user_claims(token, user)
+        return token
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Refresh the access token with the current claims of its user, so they
+    are never older than the access token lifetime.
+    """
+
+    default_error_messages = {
+        "no_active_account": "No active account found for the token"
+    }
+
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        access = AccessToken(data["access"])
+        user = (
+            get_user_model()
+            .objects.filter(
+                **{
+                    api_settings.USER_ID_FIELD: access[
+                        api_settings.USER_ID_CLAIM
+                    ]
+                }
+            )
+            .first()
+        )
+        if user is None or not user.is_active:
+            raise AuthenticationFailed(
+                self.error_messages["no_active_account"],
+                "no_active_account",
+            )
+        set_user_claims(access, user)
+        data["access"] = str(access)
+        return data
@@ -0,0 +1,11 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from user.authentication import forget_user
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def forget_cached_user(sender, instance, **kwargs):
+    forget_user(instance.pk)
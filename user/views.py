@@ -20,4 +20,5 @@ class RetrieveUserView(generics.RetrieveAPIView):
     serializer_class = UserSerializer
 
     def get_object(self):
-        return self.request.user
+        # on GET, request.user only holds the token's claims
+        return get_user_model().objects.get(pk=self.request.user.pk)